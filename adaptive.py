@@ -0,0 +1,161 @@
+import numpy as np
+
+from django.conf import settings
+
+from edutailors.apps.group_courses.cache_versions import (
+    bump_version, get_version,
+)
+from edutailors.apps.group_courses.models import (
+    AssessmentChoice, AssessmentQuestion, Enrollment,
+)
+
+# ability is estimated on a fixed grid with a standard normal prior
+ABILITY_GRID = np.linspace(-4, 4, 81)
+LOG_PRIOR = -ABILITY_GRID ** 2 / 2
+STANDARD_ERROR_TARGET = getattr(
+    settings, 'GROUP_COURSES_ADAPTIVE_STANDARD_ERROR', 0.3)
+MAX_ITEMS = getattr(settings, 'GROUP_COURSES_ADAPTIVE_MAX_ITEMS', None)
+
+# item banks of this process, rebuilt when the version in the cache changes
+_item_banks = {}
+
+
+class ItemBank:
+    """
+    Questions of one assessment in a two parameter logistic model.
+    The probability of a right answer to every item at every grid
+    ability is computed once, so estimation and selection are a few
+    vector operations.
+    """
+
+    def __init__(self, question_ids, difficulty, discrimination,
+                 valid_choices):
+        self.question_ids = np.asarray(question_ids)
+        self.positions = {
+            question_id: position
+            for position, question_id in enumerate(question_ids)
+        }
+        self.difficulty = np.asarray(difficulty, dtype=float)
+        self.discrimination = np.asarray(discrimination, dtype=float)
+        self.valid_choices = valid_choices
+        p = np.clip(
+            self.probability(ABILITY_GRID[np.newaxis, :]), 1e-9, 1 - 1e-9)
+        self.log_p = np.log(p)
+        self.log_q = np.log1p(-p)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def probability(self, ability):
+        a = self.discrimination[:, np.newaxis]
+        b = self.difficulty[:, np.newaxis]
+        return 1 / (1 + np.exp(-a * (ability - b)))
+
+    @classmethod
+    def load(cls, assessment_id):
+        questions = list(AssessmentQuestion.objects.filter(
+            assessment_id=assessment_id,
+        ).order_by('order').values_list(
+            'id', 'difficulty', 'discrimination'))
+        valid_choices = {
+            question_id: set() for question_id, _, _ in questions}
+        for question_id, choice_id in AssessmentChoice.objects.filter(
+            question__assessment_id=assessment_id,
+            is_valid=True,
+        ).values_list('question_id', 'id'):
+            valid_choices[question_id].add(choice_id)
+        question_ids = [question_id for question_id, _, _ in questions]
+        return cls(
+            question_ids,
+            [difficulty for _, difficulty, _ in questions],
+            [discrimination for _, _, discrimination in questions],
+            [frozenset(valid_choices[id]) for id in question_ids],
+        )
+
+    def score(self, selected_choices):
+        """
+        Positions and correctness of the answered items, from a dict
+        of {question_id: selected choice ids}.
+        """
+        answered = []
+        correct = []
+        for question_id, choices in selected_choices.items():
+            position = self.positions.get(question_id)
+            if position is None:
+                continue
+            answered.append(position)
+            correct.append(set(choices) == self.valid_choices[position])
+        return np.array(answered, dtype=int), np.array(correct, dtype=bool)
+
+    def estimate(self, answered, correct):
+        """Expected a posteriori ability and its standard error."""
+        log_likelihood = np.where(
+            correct[:, np.newaxis],
+            self.log_p[answered],
+            self.log_q[answered],
+        ).sum(axis=0) + LOG_PRIOR
+        posterior = np.exp(log_likelihood - log_likelihood.max())
+        posterior /= posterior.sum()
+        ability = posterior @ ABILITY_GRID
+        variance = posterior @ (ABILITY_GRID - ability) ** 2
+        return float(ability), float(np.sqrt(variance))
+
+    def select(self, ability, answered):
+        """Unanswered item with the most information at `ability`."""
+        p = self.probability(ability)[:, 0]
+        information = self.discrimination ** 2 * p * (1 - p)
+        information[answered] = -np.inf
+        position = int(np.argmax(information))
+        if np.isneginf(information[position]):
+            return None
+        return int(self.question_ids[position])
+
+
+def get_version_key(assessment_id):
+    return f'group_courses:item_bank:{assessment_id}:version'
+
+
+def invalidate_item_bank(assessment_id):
+    bump_version(get_version_key(assessment_id))
+
+
+def get_item_bank(assessment_id):
+    version = get_version(get_version_key(assessment_id))
+    cached = _item_banks.get(assessment_id)
+    if cached is None or cached[0] != version:
+        cached = (version, ItemBank.load(assessment_id))
+        _item_banks[assessment_id] = cached
+    return cached[1]
+
+
+def next_question(assessment, student_id):
+    """
+    Estimate the student ability from the answers given so far and
+    pick the next question. Returns (question id or None when the test
+    is over, ability, standard error).
+    """
+    bank = get_item_bank(assessment.id)
+    answered, correct = bank.score(assessment.get_answer_map(student_id))
+    ability, standard_error = bank.estimate(answered, correct)
+    max_items = min(MAX_ITEMS or len(bank), len(bank))
+    if len(answered) >= max_items or (
+            len(answered) and standard_error <= STANDARD_ERROR_TARGET):
+        return None, ability, standard_error
+    return bank.select(ability, answered), ability, standard_error
+
+
+def record_ability(assessment, course_id, student_id):
+    """
+    Store the ability estimate of a student once an answer is saved,
+    and complete the diagnostic test when no question is left.
+    Returns the number of updated enrollments.
+    """
+    question_id, ability, _ = next_question(assessment, student_id)
+    params = {'diagnostic_ability': ability}
+    if question_id is None:
+        params['diagnostic_status'] = \
+            Enrollment.DiagnosticStatusType.COMPLETED
+    return Enrollment.objects.filter(
+        course_id=course_id,
+        student_id=student_id,
+    ).update(**params)
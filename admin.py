@@ -1,7 +1,11 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.core.exceptions import ValidationError
 from django.forms import Textarea
 from django.db import models
-from random import choice
+from django.shortcuts import get_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils.html import format_html
 import nested_admin
 
 from edutailors.apps.group_courses.models import (
@@ -9,7 +13,9 @@ from edutailors.apps.group_courses.models import (
     Material, Assessment, Rating, AssessmentQuestion,
     AssessmentChoice, Session, StudentScore,
 )
-from edutailors.apps.big_blue_button.models import MeetingRoom
+from edutailors.apps.group_courses.analytics import analyze_assessment
+from edutailors.apps.group_courses.meeting_rooms import get_join_url
+from edutailors.apps.group_courses.services import clone_course
 
 
 @admin.register(Session)
@@ -20,47 +26,19 @@ class SessionAdmin(admin.ModelAdmin):
     actions = ['get_assistant_bbb_link', 'get_tutor_bbb_link']
     readonly_fields = ['duration']
 
-    def generate_password(size=32):
-        return ''.join(
-            [choice('abcdefghijklmnopqrstuvwxyz0123456789%*-')
-             for i in range(size)],
-        )
-
-    def get_url(translation, course, user):
-        full_name = user.get_full_name()
-        if user == course.teacher.user:
-            full_name = 'Teacher: ' + full_name
-            password = translation.moderator_password
-        elif user == course.assistant.user:
-            full_name = 'Assistant: ' + full_name
-            password = translation.moderator_password
-        else:
-            password = translation.attendee_password
-        return translation.join_url(full_name, password)
-
     def get_translation_url(role, queryset):
         if queryset.count() != 1:
             raise Exception('You can select only 1 session')
-        session = queryset.first()
+        session = queryset.select_related(
+            'lecture__course__teacher__user',
+            'lecture__course__assistant__user',
+        ).first()
         course = session.lecture.course
-        translation_id = session.id
-        defaults = {'name': '{}: {}'.format(
-            course.teacher.user.get_full_name(),
-            session.lecture.title),
-            'attendee_password': SessionAdmin.generate_password(),
-            'moderator_password': SessionAdmin.generate_password()}
-        translation, created = MeetingRoom.objects.get_or_create(
-            meeting_id=translation_id,
-            defaults=defaults,
-            lesson_type=MeetingRoom.GROUP_COURSE,
-            group_session=session)
         if role == 'assistant':
-            url = SessionAdmin.get_url(
-                translation, course, session.lecture.course.assistant.user)
+            user = course.assistant.user
         else:
-            url = SessionAdmin.get_url(
-                translation, course, session.lecture.course.teacher.user)
-        return url
+            user = course.teacher.user
+        return get_join_url(session, user)
 
     def get_assistant_bbb_link(self, request, queryset):
         params = {
@@ -100,14 +78,19 @@ class LectureInline(nested_admin.NestedTabularInline):
 @admin.register(Enrollment)
 class EnrollmentAdmin(admin.ModelAdmin):
     exclude = ['enabled']
-    list_display = ('student', 'id', 'course', 'created', 'updated')
+    list_display = (
+        'student', 'id', 'course', 'status', 'created', 'updated',
+    )
     list_filter = ['course']
 
 
 class MaterialInline(nested_admin.NestedTabularInline):
     model = Material
     extra = 1
-    exclude = ['file_path_within_bucket', 'enabled']
+    exclude = [
+        'file_path_within_bucket', 'thumbnail_path_within_bucket',
+        'preview_path_within_bucket', 'enabled',
+    ]
     formfield_overrides = {
         models.TextField: {'widget': Textarea(attrs={'rows': 3, 'cols': 40})},
     }
@@ -160,10 +143,11 @@ class CourseAdmin(nested_admin.NestedModelAdmin):
     list_display = (
         'title', 'id', 'slug', 'description',
         'image', 'start_date', 'end_date', 'cost',
-        'capacity', 'created',
+        'capacity', 'seats_taken', 'created',
         'updated', 'teacher', 'assistant',
     )
-    readonly_fields = ['status']
+    readonly_fields = ['status', 'seats_taken']
+    actions = ['clone_courses']
     search_fields = ['title', 'description', 'status']
     list_filter = ['status', 'cost', 'capacity']
     exclude = ['enabled']
@@ -181,6 +165,71 @@ class CourseAdmin(nested_admin.NestedModelAdmin):
             'all': ('base.css', 'forms.css'),
         }
 
+    def clone_courses(self, request, queryset):
+        cloned = 0
+        for course in queryset:
+            try:
+                clone_course(course)
+            except ValidationError as e:
+                # sessions cloned at the same times double book the
+                # teacher, such courses are cloned from the api with
+                # a new start date
+                self.message_user(
+                    request, f'{course} is not cloned: {e.messages[0]}',
+                    level=messages.ERROR,
+                )
+            else:
+                cloned += 1
+        self.message_user(request, f'Cloned {cloned} courses')
+    clone_courses.short_description = 'Clone selected courses'
+
+
+@admin.register(Assessment)
+class AssessmentAdmin(admin.ModelAdmin):
+    list_display = (
+        'title', 'id', 'course', 'assessment_type', 'questions_count',
+        'analytics_link',
+    )
+    list_filter = ['assessment_type', 'course']
+    search_fields = ['title', 'course__title']
+    readonly_fields = ['duration', 'questions_count']
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/analytics/',
+                self.admin_site.admin_view(self.analytics_view),
+                name='group_courses_assessment_analytics',
+            ),
+        ] + super().get_urls()
+
+    def analytics_link(self, obj):
+        url = reverse(
+            'admin:group_courses_assessment_analytics', args=[obj.pk])
+        return format_html('<a href="{}">Analytics</a>', url)
+    analytics_link.short_description = 'Analytics'
+
+    def analytics_view(self, request, pk):
+        assessment = get_object_or_404(Assessment, pk=pk)
+        analytics = analyze_assessment(assessment)
+        titles = dict(AssessmentChoice.objects.filter(
+            question__assessment=assessment,
+        ).values_list('id', 'title'))
+        question_titles = dict(
+            assessment.questions.values_list('id', 'title'))
+        for question in analytics['questions']:
+            question['title'] = question_titles.get(question['id'])
+            for choice in question['choices']:
+                choice['title'] = titles.get(choice['id'])
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            assessment=assessment,
+            analytics=analytics,
+        )
+        return TemplateResponse(
+            request, 'admin/group_courses/assessment/analytics.html', context)
+
 
 @admin.register(StudentScore)
 class StudentScoreAdmin(admin.ModelAdmin):
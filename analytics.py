@@ -0,0 +1,129 @@
+from array import array
+
+import numpy as np
+
+from edutailors.apps.group_courses.models import (
+    AssessmentAnswer, AssessmentChoice,
+)
+
+CHUNK_SIZE = 5000
+
+
+def load_choices(assessment):
+    """Choice ids, question ids and correctness, grouped by question."""
+    rows = list(AssessmentChoice.objects.filter(
+        question__assessment=assessment,
+    ).order_by('question__order', 'question_id', 'id').values_list(
+        'id', 'question_id', 'is_valid'))
+    choice_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    question_ids = np.array([row[1] for row in rows], dtype=np.int64)
+    valid = np.array([row[2] for row in rows], dtype=bool)
+    return choice_ids, question_ids, valid
+
+
+def load_answers(assessment):
+    """
+    Student ids, attempt ids and choice ids of every answer, read with
+    one streaming query into compact arrays.
+    """
+    students = array('q')
+    attempts = array('q')
+    choices = array('q')
+    rows = AssessmentAnswer.objects.filter(
+        choice__question__assessment=assessment,
+    ).order_by().values_list('student_id', 'attempt_id', 'choice_id')
+    for student_id, attempt_id, choice_id in rows.iterator(
+            chunk_size=CHUNK_SIZE):
+        students.append(student_id)
+        attempts.append(attempt_id or 0)
+        choices.append(choice_id)
+    return (
+        np.asarray(students, dtype=np.int64),
+        np.asarray(attempts, dtype=np.int64),
+        np.asarray(choices, dtype=np.int64),
+    )
+
+
+def build_selection_matrix(choice_ids, students, attempts, choices):
+    """
+    Boolean student x choice matrix of the latest attempt of every
+    student. Columns follow `choice_ids`.
+    """
+    student_ids, rows = np.unique(students, return_inverse=True)
+    latest = np.zeros(len(student_ids), dtype=np.int64)
+    np.maximum.at(latest, rows, attempts)
+    order = np.argsort(choice_ids)
+    positions = np.searchsorted(choice_ids, choices, sorter=order)
+    columns = order[np.minimum(positions, len(order) - 1)]
+    # answers to choices added after the choices were loaded are skipped
+    keep = (attempts == latest[rows]) & (choice_ids[columns] == choices)
+    selected = np.zeros((len(student_ids), len(choice_ids)), dtype=bool)
+    selected[rows[keep], columns[keep]] = True
+    return student_ids, selected
+
+
+def item_statistics(selected, valid, question_ids):
+    """
+    Classical item statistics from a student x choice matrix whose
+    columns are grouped by question.
+
+    A question is right when the selected choices are exactly its
+    valid ones. Discrimination is the point-biserial correlation of
+    the question with the rest of the score.
+    """
+    starts = np.flatnonzero(
+        np.r_[True, question_ids[1:] != question_ids[:-1]])
+    mismatches = np.add.reduceat(selected != valid, starts, axis=1)
+    answered = np.add.reduceat(selected, starts, axis=1) > 0
+    correct = (answered & (mismatches == 0)).astype(float)
+
+    students = len(selected)
+    percent_correct = correct.mean(axis=0) * 100
+    rest = correct.sum(axis=1)[:, np.newaxis] - correct
+    covariance = (correct * rest).mean(axis=0) \
+        - correct.mean(axis=0) * rest.mean(axis=0)
+    deviation = correct.std(axis=0) * rest.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discrimination = np.where(
+            deviation > 0, covariance / deviation, np.nan)
+    choice_counts = selected.sum(axis=0)
+    return {
+        'students': students,
+        'question_ids': question_ids[starts],
+        'percent_correct': percent_correct,
+        'discrimination': discrimination,
+        'choice_counts': choice_counts,
+        'choice_frequency': choice_counts / max(students, 1),
+    }
+
+
+def analyze_assessment(assessment):
+    """Per question and per choice statistics, ready to serialize."""
+    choice_ids, question_ids, valid = load_choices(assessment)
+    if not len(choice_ids):
+        return {'students': 0, 'questions': []}
+    _, selected = build_selection_matrix(
+        choice_ids, *load_answers(assessment))
+    stats = item_statistics(selected, valid, question_ids)
+
+    questions = []
+    for position, question_id in enumerate(stats['question_ids']):
+        discrimination = stats['discrimination'][position]
+        columns = np.flatnonzero(question_ids == question_id)
+        questions.append({
+            'id': int(question_id),
+            'percent_correct': float(stats['percent_correct'][position]),
+            'discrimination': (
+                None if np.isnan(discrimination) else float(discrimination)
+            ),
+            'choices': [
+                {
+                    'id': int(choice_ids[column]),
+                    'is_valid': bool(valid[column]),
+                    'count': int(stats['choice_counts'][column]),
+                    'frequency': float(stats['choice_frequency'][column]),
+                }
+                for column in columns
+            ],
+        })
+    return {'students': stats['students'], 'questions': questions}
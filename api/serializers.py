@@ -2,10 +2,17 @@ from rest_framework import serializers
 from django.db.models import Avg
 
 from edutailors.apps.education_lists.api.serializers import SubjectSerializer
+from edutailors.apps.group_courses.custom_storage import S3Storage
 from edutailors.apps.group_courses.models import (
     Course, Lecture, Enrollment,
     Material, Assessment, AssessmentQuestion, AssessmentChoice,
-    AssessmentAnswer, Rating, Session,
+    AssessmentAnswer, AssessmentAttempt, Rating, Session,
+)
+from edutailors.apps.group_courses.querysets import (
+    MAX_SCHEDULE_WINDOW_DAYS, SCHEDULE_WINDOW_DAYS,
+)
+from edutailors.apps.group_courses.timetable import (
+    MAX_RECURRING_INTERVAL_DAYS, MAX_RECURRING_SESSIONS,
 )
 from edutailors.apps.profiles.api.serializers import TutorDetailSerializer
 
@@ -29,6 +36,47 @@ class SessionSerializer(serializers.ModelSerializer):
         )
 
 
+class ScheduleSessionSerializer(serializers.ModelSerializer):
+    lecture_title = serializers.CharField(source='lecture.title')
+    course = serializers.IntegerField(source='lecture.course_id')
+    course_title = serializers.CharField(source='lecture.course.title')
+
+    class Meta:
+        model = Session
+        fields = (
+            'id', 'start_date', 'end_date', 'description', 'duration',
+            'lecture', 'lecture_title', 'course', 'course_title',
+        )
+
+
+class ScheduleQuerySerializer(serializers.Serializer):
+    days = serializers.IntegerField(
+        min_value=1, max_value=MAX_SCHEDULE_WINDOW_DAYS,
+        default=SCHEDULE_WINDOW_DAYS,
+    )
+
+
+class CourseCloneSerializer(serializers.Serializer):
+    # naive dates are made aware in the current time zone
+    start_date = serializers.DateTimeField(required=False)
+
+
+class RecurringSessionsSerializer(serializers.Serializer):
+    # naive dates are made aware in the current time zone
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    count = serializers.IntegerField(
+        min_value=1, max_value=MAX_RECURRING_SESSIONS, default=1)
+    interval_days = serializers.IntegerField(
+        min_value=1, max_value=MAX_RECURRING_INTERVAL_DAYS, default=7)
+
+    def validate(self, data):
+        if data['start_date'] >= data['end_date']:
+            raise serializers.ValidationError(
+                'end_date should be after start_date')
+        return data
+
+
 class LectureSerializer(serializers.ModelSerializer):
     sessions = SessionSerializer(many=True, required=False)
 
@@ -47,16 +95,44 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'enabled', 'student', 'course',
             'created', 'updated', 'diagnostic_status',
+            'status',
         )
+        read_only_fields = ('status',)
 
 
 class MaterialSerializer(serializers.ModelSerializer):
+    document_url = serializers.SerializerMethodField(read_only=True)
+    thumbnail_url = serializers.SerializerMethodField(read_only=True)
+    preview_url = serializers.SerializerMethodField(read_only=True)
+
+    def get_document_url(self, obj):
+        if obj.file_path_within_bucket:
+            return S3Storage().signed_url(obj.file_path_within_bucket)
+        return obj.document
+
+    def get_thumbnail_url(self, obj):
+        if obj.thumbnail_path_within_bucket:
+            return S3Storage().signed_url(obj.thumbnail_path_within_bucket)
+        return None
+
+    def get_preview_url(self, obj):
+        if obj.preview_path_within_bucket:
+            return S3Storage().signed_url(obj.preview_path_within_bucket)
+        return None
+
+    def to_representation(self, obj):
+        data = super().to_representation(obj)
+        # the stored document url points to a private object
+        data['document'] = data['document_url']
+        return data
+
     class Meta:
         model = Material
         fields = (
             'document', 'description', 'enabled',
             'course', 'created', 'updated', 'id',
-            'gmat', 'sat', 'gre',
+            'gmat', 'sat', 'gre', 'document_url',
+            'thumbnail_url', 'preview_url',
         )
 
 
@@ -64,7 +140,19 @@ class AssessmentAnswerSerializer(serializers.ModelSerializer):
     class Meta:
         model = AssessmentAnswer
         fields = (
-            'student', 'choice', 'created', 'id',
+            'student', 'choice', 'created', 'id', 'attempt',
+        )
+        read_only_fields = ('attempt',)
+
+
+class AssessmentAttemptSerializer(serializers.ModelSerializer):
+    deadline = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = AssessmentAttempt
+        fields = (
+            'id', 'assessment', 'student', 'number', 'started_at',
+            'submitted_at', 'deadline',
         )
 
 
@@ -99,6 +187,20 @@ class AssessmentQuestionSerializer(serializers.ModelSerializer):
         )
 
 
+class StudentChoiceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AssessmentChoice
+        fields = ('id', 'title', 'description')
+
+
+class NextQuestionSerializer(serializers.ModelSerializer):
+    choices = StudentChoiceSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = AssessmentQuestion
+        fields = ('id', 'title', 'description', 'order', 'choices')
+
+
 class AssessmentSerializer(serializers.ModelSerializer):
     questions = AssessmentQuestionSerializer(
         many=True, required=False)
@@ -108,15 +210,10 @@ class AssessmentSerializer(serializers.ModelSerializer):
         user = request.user
         assessment_type = request.data.get('assessment_type')
 
-        questions = obj.questions
+        questions = obj.questions.all()
         if assessment_type == Assessment.DIAGNOSTIC:
-            answers_ids = AssessmentAnswer.objects.filter(
-                student=user.student_profile,
-            ).values_list('choice__question', flat=True).distinct()
-            questions = questions.filter(
-                assessment__assessment_type=assessment_type).exclude(
-                    test_choices__test_question__in=answers_ids,
-            )
+            questions = questions.exclude(
+                choices__answers__student=user.student_profile)
         return AssessmentQuestionSerializer(
             questions, many=True, required=False,
         ).data
@@ -131,6 +228,18 @@ class AssessmentSerializer(serializers.ModelSerializer):
         )
 
 
+class ExamPaperSerializer(serializers.ModelSerializer):
+    questions = NextQuestionSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Assessment
+        fields = (
+            'id', 'title', 'description', 'duration', 'start_date',
+            'end_date', 'valid_until', 'max_number_of_retries',
+            'course', 'total_score', 'assessment_type', 'questions',
+        )
+
+
 class RatingSerializer(serializers.ModelSerializer):
     student_info = serializers.SerializerMethodField(read_only=True)
     average_rating = serializers.SerializerMethodField(read_only=True)
@@ -172,7 +281,7 @@ class GroupCourseSerializer(serializers.ModelSerializer):
     average_rating_weight = serializers.SerializerMethodField(read_only=True)
     average_rating = serializers.SerializerMethodField(read_only=True)
     test_drive_available = serializers.SerializerMethodField(read_only=True)
-    material_type = serializers.SerializerMethodField(read_only=True)
+    material_type = serializers.CharField(read_only=True)
     allow_to_rate = serializers.SerializerMethodField(read_only=True)
 
     def get_test_drive_available(self, obj):
@@ -189,7 +298,10 @@ class GroupCourseSerializer(serializers.ModelSerializer):
     def get_user_is_enrolled(self, obj):
         if self.context['request'].user.is_authenticated:
             user = self.context['request'].user
-            return obj.enrollments.filter(student__user=user).exists()
+            return obj.enrollments.filter(
+                student__user=user,
+                status=Enrollment.StatusType.ENROLLED,
+            ).exists()
         return None
 
     def get_average_rating_weight(self, obj):
@@ -199,14 +311,6 @@ class GroupCourseSerializer(serializers.ModelSerializer):
     def get_average_rating(self, obj):
         return obj.get_average_rating
 
-    def get_material_type(self, obj):
-        if obj.materials.filter(gmat__isnull=False).exists():
-            return 'gmat'
-        elif obj.materials.filter(gre__isnull=False).exists():
-            return 'gre'
-        elif obj.materials.filter(sat__isnull=False).exists():
-            return 'sat'
-
     def get_allow_to_rate(self, obj):
         user = self.context['request'].user
         if user:
@@ -221,7 +325,7 @@ class GroupCourseSerializer(serializers.ModelSerializer):
         fields = (
             'id', 'title', 'slug', 'description',
             'image', 'start_date', 'end_date', 'cost',
-            'capacity', 'status', 'enabled', 'created',
+            'capacity', 'seats_taken', 'status', 'enabled', 'created',
             'updated', 'teacher', 'teacher_info', 'subject',
             'subject_id', 'lectures', 'enrollments', 'materials',
             'user_is_enrolled', 'assessments', 'ratings',
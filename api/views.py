@@ -1,27 +1,71 @@
-import os
-import uuid
+import math
+import tarfile
+import zipfile
+from datetime import timedelta
 import django_filters
 
+from django.core.exceptions import ValidationError
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404
+from django.utils.timezone import now
+
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.renderers import JSONRenderer
 
+from edutailors.apps.group_courses import (
+    adaptive, analytics, gradebook, leaderboard, question_bank,
+)
 from edutailors.apps.group_courses.custom_storage import S3Storage
+from edutailors.apps.group_courses.exam_papers import get_student_exam_paper
+from edutailors.apps.group_courses.material_import import (
+    DOCUMENTS_DIRECTORY, get_unique_file_path, import_materials,
+)
 from edutailors.apps.group_courses.models import (
     Course, Lecture, Enrollment,
     Material, Assessment, Rating, AssessmentQuestion,
-    AssessmentChoice, AssessmentAnswer, SessionStudent,
+    AssessmentChoice, AssessmentAnswer,
     Session, StudentScore,
 )
 from .serializers import (
     GroupCourseSerializer, LectureSerializer, EnrollmentSerializer,
+    SessionSerializer, ScheduleSessionSerializer, NextQuestionSerializer,
+    ScheduleQuerySerializer, RecurringSessionsSerializer,
+    CourseCloneSerializer,
     MaterialSerializer, RatingSerializer, AssessmentSerializer,
     AssessmentQuestionSerializer, AssessmentChoiceSerializer,
-    AssessmentAnswerSerializer,
+    AssessmentAnswerSerializer, AssessmentAttemptSerializer,
 )
 from .filters import CourseFilterSet
+from edutailors.apps.group_courses.timetable import (
+    generate_recurring_sessions,
+)
+from edutailors.apps.group_courses.calendars import (
+    OWNER_PROFILES, get_calendar_feed, get_feed_owner, get_feed_token,
+    get_owner_id,
+)
+from edutailors.apps.group_courses.services import (
+    clone_course, move_students, record_diagnostic_answer,
+)
+from edutailors.apps.group_courses.meeting_rooms import (
+    STUDENT as STUDENT_ROLE, get_join_url, get_role,
+)
+
+
+def stream_json_list(serializer_class, queryset, chunk_size=500):
+    renderer = JSONRenderer()
+    yield b'['
+    for number, obj in enumerate(queryset.iterator(chunk_size=chunk_size)):
+        if number:
+            yield b','
+        yield renderer.render(serializer_class(obj).data)
+    yield b']'
 
 
 class CourseListCreateViewSet(generics.ListCreateAPIView):
@@ -40,6 +84,82 @@ class GetUpdateRemoveCourseViewSet(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [AllowAny]
 
 
+class CourseCloneView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        course = Course.objects.filter(id=pk).first()
+        if not course:
+            return Response(
+                {'message': 'Course not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not course.is_managed_by(request.user):
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        data = CourseCloneSerializer(data=request.data)
+        if not data.is_valid():
+            return Response(
+                {'message': data.errors},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        try:
+            clone = clone_course(
+                course, data.validated_data.get('start_date'))
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            {'id': clone.id, 'slug': clone.slug},
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class CourseGradebookView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        course = Course.objects.filter(id=pk).first()
+        if not course:
+            return Response(
+                {'message': 'Course not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not course.is_managed_by(request.user):
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        export = request.query_params.get('export')
+        if export == gradebook.CSV:
+            response = StreamingHttpResponse(
+                gradebook.export_csv(course), content_type='text/csv')
+        elif export == gradebook.XLSX:
+            try:
+                file = gradebook.export_xlsx(course)
+            except ImportError:
+                return Response(
+                    {'message': 'XLSX export is not available'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            response = FileResponse(file, content_type=(
+                'application/'
+                'vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            ))
+        else:
+            return Response({
+                'assessments': gradebook.get_assessments(course),
+                'students': list(gradebook.iter_students(course)),
+            })
+        response['Content-Disposition'] = \
+            f'attachment; filename="gradebook-{pk}.{export}"'
+        return response
+
+
 class LectureListCreateViewSet(generics.ListCreateAPIView):
     queryset = Lecture.objects.all()
     serializer_class = LectureSerializer
@@ -52,6 +172,41 @@ class LectureGetUpdateRemoveViewSet(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
+class LectureRecurringSessionsCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        lecture = Lecture.objects.filter(id=pk).first()
+        if not lecture:
+            return Response(
+                {'message': 'Lecture not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        data = RecurringSessionsSerializer(data=request.data)
+        if not data.is_valid():
+            return Response(
+                {'message': data.errors},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        start_date = data.validated_data['start_date']
+        end_date = data.validated_data['end_date']
+        count = data.validated_data['count']
+        interval_days = data.validated_data['interval_days']
+        try:
+            sessions = generate_recurring_sessions(
+                lecture, start_date, end_date, count,
+                interval=timedelta(days=interval_days),
+            )
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        serializer = SessionSerializer(
+            sessions, many=True, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class EnrollmentListCreateViewSet(generics.ListCreateAPIView):
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
@@ -77,14 +232,8 @@ class MaterialCreateAPIView(generics.CreateAPIView):
         sat = data.get('sat')
         gre = data.get('gre')
         file = request.FILES.get('file', '')
-        file_name = file.name.split('.')[-2]
-        file_format = file.name.split('.')[-1]
-        new_unique_file_name = f'{file_name}-{uuid.uuid4().hex}.{file_format}'
-        file_directory_within_bucket = 'group-courses/documents'
-        file_path_within_bucket = os.path.join(
-            file_directory_within_bucket,
-            new_unique_file_name,
-        )
+        file_directory_within_bucket = DOCUMENTS_DIRECTORY
+        file_path_within_bucket = get_unique_file_path(file.name)
 
         s3_storage = S3Storage()
         if not s3_storage.exists(file_path_within_bucket):
@@ -110,6 +259,45 @@ class MaterialCreateAPIView(generics.CreateAPIView):
             }, status=status.HTTP_409_CONFLICT)
 
 
+class MaterialBulkCreateAPIView(generics.CreateAPIView):
+    queryset = Material.objects.all()
+    serializer_class = MaterialSerializer
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        data = request.POST
+        archive = request.FILES.get('file')
+        course = Course.objects.filter(id=data.get('course')).first()
+        if not course or not archive:
+            return Response(
+                {'message': 'course and file field is required'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        subcategory = {
+            sub: data.get(sub) for sub in Material.SUBCATEGORIES
+            if data.get(sub)
+        }
+        try:
+            if len(subcategory) > 1:
+                raise ValidationError('You need add only 1 subcategory')
+            added_sub = next(iter(subcategory), None)
+            Material.validate_course_subcategory(course, added_sub)
+            materials = import_materials(
+                course, archive, data.get('description', ''), **subcategory)
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        except (tarfile.TarError, zipfile.BadZipFile):
+            return Response(
+                {'message': 'file should be a zip or tar archive'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        serializer = self.get_serializer(materials, many=True)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
 class MaterialGetUpdateRemoveViewSet(generics.RetrieveUpdateDestroyAPIView):
     queryset = Material.objects.all()
     serializer_class = MaterialSerializer
@@ -117,9 +305,18 @@ class MaterialGetUpdateRemoveViewSet(generics.RetrieveUpdateDestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        if instance.file_path_within_bucket:
-            s3_storage = S3Storage()
-            s3_storage.delete(instance.file_path_within_bucket)
+        # cloned courses share documents, keep files still in use
+        shared = Material.objects.filter(
+            file_path_within_bucket=instance.file_path_within_bucket,
+        ).exclude(id=instance.id).exists()
+        s3_storage = S3Storage()
+        for path in (
+            instance.file_path_within_bucket,
+            instance.thumbnail_path_within_bucket,
+            instance.preview_path_within_bucket,
+        ):
+            if path and not shared:
+                s3_storage.delete(path)
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -183,6 +380,126 @@ class AssessmentGetUpdateRemoveViewSet(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
+class ExamPaperView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        student = getattr(request.user, 'student_profile', None)
+        if student is None:
+            return Response(
+                {'message': 'Only students can take assessments'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        assessment = get_object_or_404(
+            Assessment.objects.only('course_id', 'start_date'), id=pk)
+        if not Enrollment.objects.filter(
+            course_id=assessment.course_id,
+            student=student,
+            status=Enrollment.StatusType.ENROLLED,
+        ).exists():
+            return Response(
+                {'message': 'You are not enrolled in this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if assessment.start_date > now():
+            return Response(
+                {'message': 'Assessment has not started yet'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        body = get_student_exam_paper(pk, student.id)
+        if body is None:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return HttpResponse(body, content_type='application/json')
+
+
+class AssessmentAnalyticsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        assessment = Assessment.objects.filter(id=pk).first()
+        if not assessment:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        # choices are reported with is_valid, only teachers may see them
+        if not Course(id=assessment.course_id).is_managed_by(request.user):
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return Response(analytics.analyze_assessment(assessment))
+
+
+class AssessmentQuestionBankExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        assessment = Assessment.objects.filter(id=pk).first()
+        if not assessment:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not Course(id=assessment.course_id).is_managed_by(request.user):
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if request.query_params.get('export') == question_bank.CSV:
+            rows = question_bank.export_csv(assessment)
+            content_type = 'text/csv'
+            extension = 'csv'
+        else:
+            rows = question_bank.export_jsonl(assessment)
+            content_type = 'application/x-ndjson'
+            extension = 'jsonl'
+        response = StreamingHttpResponse(rows, content_type=content_type)
+        response['Content-Disposition'] = \
+            f'attachment; filename="assessment-{pk}.{extension}"'
+        return response
+
+
+class AssessmentQuestionBankImportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        assessment = Assessment.objects.filter(id=pk).first()
+        if not assessment:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if not Course(id=assessment.course_id).is_managed_by(request.user):
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        file = request.FILES.get('file')
+        file_format = request.data.get('format', question_bank.JSONL)
+        if not file or file_format not in question_bank.FORMATS:
+            return Response(
+                {'message': 'file and format (jsonl or csv) '
+                            'field is required'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        try:
+            questions, choices = question_bank.import_questions(
+                assessment, file, file_format)
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {'questions': questions, 'choices': choices},
+            status=status.HTTP_201_CREATED,
+        )
+
+
 class AssessmentQuestionListCreateViewSet(generics.ListCreateAPIView):
     queryset = AssessmentQuestion.objects.all()
     serializer_class = AssessmentQuestionSerializer
@@ -227,24 +544,57 @@ class AssessmentAnswerCreateAPIView(generics.CreateAPIView):
         new_data = [
             {'choice': choice, 'student': student} for choice in choices
         ]
-        choice = choices[0]
         assessment = Assessment.objects.filter(
-            questions__choices=choice).first()
-        choices = AssessmentChoice.objects.filter(
-            question__assessment=assessment).values_list('id', flat=True)
-        old_answer = self.get_queryset().filter(
-            choice__in=choices, student=student)
-        old_answer.delete()
+            questions__choices=choices[0]).first()
+        if not assessment:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        try:
+            attempt = assessment.start_attempt(student)
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages[0]},
+                status=status.HTTP_409_CONFLICT,
+            )
 
         serializer = self.get_serializer(data=new_data, many=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        # answers to the same questions in this attempt are replaced,
+        # earlier attempts are kept
+        self.get_queryset().filter(
+            attempt=attempt,
+            choice__question__in=AssessmentChoice.objects.filter(
+                id__in=choices).values('question_id'),
+        ).delete()
+        serializer.save(attempt=attempt)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers,
         )
 
 
+class AssessmentAttemptSubmitView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        assessment = Assessment.objects.filter(id=pk).first()
+        if not assessment:
+            return Response(
+                {'message': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        attempt = assessment.get_latest_attempt(
+            request.user.student_profile.id)
+        if not attempt or not attempt.submit():
+            return Response(
+                {'message': 'No attempt in progress'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(AssessmentAttemptSerializer(attempt).data)
+
+
 class DiagnosticTestAnswerCreateAPIView(generics.CreateAPIView):
     queryset = AssessmentAnswer.objects.all()
     serializer_class = AssessmentAnswerSerializer
@@ -255,39 +605,107 @@ class DiagnosticTestAnswerCreateAPIView(generics.CreateAPIView):
         student = request.user.student_profile
         choices = data.get('choice')
         course_id = data.get('course_id')
-        new_data = [
-            {'choice': choice, 'student': student.id} for choice in choices
-        ]
         if not course_id or not choices:
             return Response(
                 {'message': 'course_id and choice field is required'},
                 status=status.HTTP_422_UNPROCESSABLE_ENTITY,
             )
+        new_data = [
+            {'choice': choice, 'student': student.id} for choice in choices
+        ]
 
-        choice = AssessmentChoice.objects.filter(id=choices[0]).first()
-        enrollment = Enrollment.objects.filter(
-            course_id=course_id,
-            student=student,
-        )
-
-        if choice.first_question():
-            enrollment.update(
-                diagnostic_status=Enrollment.DiagnosticStatusType.IN_PROGRESS,
+        choice = AssessmentChoice.objects.filter(
+            id=choices[0],
+        ).select_related('question__assessment__course').first()
+        if not choice:
+            return Response(
+                {'message': 'Choice not found'},
+                status=status.HTTP_404_NOT_FOUND,
             )
-        if choice.last_question():
-            enrollment.update(
-                diagnostic_status=Enrollment.DiagnosticStatusType.COMPLETED,
+        # the attempt is resolved first, nothing is recorded without one
+        try:
+            attempt = choice.question.assessment.start_attempt(student.id)
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages[0]},
+                status=status.HTTP_409_CONFLICT,
             )
 
         serializer = self.get_serializer(data=new_data, many=True)
         serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        record_diagnostic_answer(course_id, student, choice.question)
+        serializer.save(attempt=attempt)
+        if choice.question.assessment.course.is_adaptive:
+            adaptive.record_ability(
+                choice.question.assessment, course_id, student.id)
         headers = self.get_success_headers(serializer.data)
         return Response(
             serializer.data, status=status.HTTP_201_CREATED, headers=headers,
         )
 
 
+class NextDiagnosticQuestionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, course_id):
+        student = request.user.student_profile
+        enrollment = Enrollment.objects.filter(
+            course_id=course_id,
+            student=student,
+        ).select_related('course').first()
+        if not enrollment:
+            return Response(
+                {'message': 'Enrollment not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        if enrollment.course.is_adaptive:
+            return self.get_adaptive(enrollment)
+
+        questions = AssessmentQuestion.objects.filter(
+            assessment__course_id=course_id,
+            assessment__assessment_type=Assessment.DIAGNOSTIC,
+            assessment__is_valid=True,
+        )
+        # answers can arrive in any order, so the first question the
+        # student has not answered is served rather than the one after
+        # the furthest answer
+        question = questions.exclude(
+            choices__answers__student=student,
+        ).prefetch_related('choices').first()
+        data = {
+            'question': (
+                NextQuestionSerializer(question).data if question else None
+            ),
+            'remaining': max(
+                questions.count() - enrollment.diagnostic_answered_count, 0),
+        }
+        return Response(data)
+
+    def get_adaptive(self, enrollment):
+        assessment = enrollment.course.get_diagnostic_test()
+        if not assessment:
+            return Response(
+                {'message': 'Diagnostic test not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        # read only, the enrollment is updated when an answer is saved
+        question_id, ability, standard_error = adaptive.next_question(
+            assessment, enrollment.student_id)
+        question = None
+        if question_id is not None:
+            question = AssessmentQuestion.objects.filter(
+                id=question_id).prefetch_related('choices').first()
+        data = {
+            'question': (
+                NextQuestionSerializer(question).data if question else None
+            ),
+            'remaining': None,
+            'ability': ability,
+            'standard_error': standard_error,
+        }
+        return Response(data)
+
+
 class AssessmentAnswerGetUpdateRemoveViewSet(
     generics.RetrieveUpdateDestroyAPIView,
 ):
@@ -318,6 +736,36 @@ class AssessmentSelectedChoicesView(APIView):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class AssessmentAnswerMapView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        assessment = get_object_or_404(Assessment, id=pk)
+        student = getattr(request.user, 'student_profile', None)
+        student_id = request.query_params.get('student')
+        if student_id is None or (
+                student and student_id == str(student.id)):
+            if student is None:
+                return Response(
+                    {'message': 'student field is required'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            student_id = student.id
+        elif not Course(id=assessment.course_id).is_taught_by(
+                request.user):
+            # answers of other students are shown to the course teachers
+            return Response(
+                {'message': 'You do not teach this course'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        elif not student_id.isdigit():
+            return Response(
+                {'message': 'student should be a number'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        return Response(assessment.get_answer_map(student_id))
+
+
 class AssessmentRightChoicesView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -346,13 +794,16 @@ def get_student_result_view(request):
     StudentScore.objects.update_or_create(
         assessment=assessment,
         student_id=student_id,
-        score=score,
+        defaults={'score': score},
     )
 
-    if persent >= 60 or assessment.assessment_type == Assessment.DIAGNOSTIC:
+    if assessment.is_passed(score):
         result['pass'] = True
     else:
         result['pass'] = False
+    # scores are stored as integers
+    result.update(
+        leaderboard.get_standing(assessment.id, student_id, int(score)))
     return Response(result)
 
 
@@ -362,13 +813,189 @@ class ChangeSessionView(APIView):
     def post(self, request, *args, **kwargs):
         student_id = request.data.get('student_id')
         session_id = request.data.get('session_id')
-        session = Session.objects.filter(id=session_id).first()
-        SessionStudent.objects.filter(
-            session__lecture=session.lecture,
-            student_id=student_id,
-        ).update(session=session)
+        try:
+            move_students(session_id, student_ids=[student_id])
+        except Session.DoesNotExist:
+            return Response(
+                {'message': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_409_CONFLICT,
+            )
 
         return Response(
             {'message': 'Session Updated'},
             status=status.HTTP_201_CREATED,
         )
+
+
+class BulkChangeSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        session_id = request.data.get('session_id')
+        student_ids = request.data.get('student_ids')
+        from_session_id = request.data.get('from_session_id')
+        if not session_id or (student_ids is None and not from_session_id):
+            return Response(
+                {'message': 'session_id and student_ids or '
+                            'from_session_id field is required'},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        try:
+            result = move_students(
+                session_id,
+                student_ids=student_ids,
+                from_session_id=from_session_id,
+            )
+        except Session.DoesNotExist:
+            return Response(
+                {'message': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        except ValidationError as e:
+            return Response(
+                {'message': e.messages},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(result, status=status.HTTP_200_OK)
+
+
+class StudentScheduleView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = ScheduleQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response(
+                {'message': query.errors},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        student = request.user.student_profile
+        sessions = Session.objects.for_student(student).upcoming(
+            query.validated_data['days'])
+        serializer = ScheduleSessionSerializer(sessions, many=True)
+        return Response(serializer.data)
+
+
+class StudentScheduleHistoryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        student = request.user.student_profile
+        sessions = Session.objects.for_student(student).past()
+        return StreamingHttpResponse(
+            stream_json_list(ScheduleSessionSerializer, sessions),
+            content_type='application/json',
+        )
+
+
+class StudentJoinableSessionsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        at = now()
+        sessions = Session.objects.for_student(request.user.student_profile)
+        joinable = ScheduleSessionSerializer(
+            sessions.joinable(at), many=True).data
+        next_join_date = None if joinable else sessions.next_join_date(at)
+        response = Response({
+            'sessions': joinable,
+            'next_join_date': next_join_date,
+        })
+        if next_join_date:
+            # clients wait until the next session opens instead of polling
+            response['Retry-After'] = max(
+                math.ceil((next_join_date - at).total_seconds()), 1)
+        return response
+
+
+def calendar_feed_response(request, kind, owner_id):
+    etag, chunks = get_calendar_feed(kind, owner_id)
+    if etag in request.META.get('HTTP_IF_NONE_MATCH', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = StreamingHttpResponse(
+            chunks, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+class CalendarFeedView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind):
+        if kind not in OWNER_PROFILES:
+            return Response(
+                {'message': 'Calendar not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        owner_id = get_owner_id(kind, request.user)
+        if owner_id is None:
+            return Response(
+                {'message': f'You have no {kind} calendar'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        return self.respond(request, kind, owner_id)
+
+    def respond(self, request, kind, owner_id):
+        return calendar_feed_response(request, kind, owner_id)
+
+
+class CalendarFeedTokenView(CalendarFeedView):
+    """Token of the feed URL that calendar clients subscribe to."""
+
+    def respond(self, request, kind, owner_id):
+        return Response({'token': get_feed_token(kind, owner_id)})
+
+
+class TokenCalendarFeedView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, token):
+        owner = get_feed_owner(token)
+        if owner is None:
+            return Response(
+                {'message': 'Calendar not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        return calendar_feed_response(request, *owner)
+
+
+class SessionJoinUrlView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        session = Session.objects.filter(id=pk).select_related(
+            'lecture__course__teacher',
+            'lecture__course__assistant',
+        ).first()
+        if not session:
+            return Response(
+                {'message': 'Session not found'},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+        user = request.user
+        if get_role(session, user) == STUDENT_ROLE and \
+                not session.session_student.filter(
+                    student__user=user).exists():
+            return Response(
+                {'message': 'You are not a student of this session'},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+        if session.has_ended:
+            return Response(
+                {'message': 'Session has ended'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        if not session.can_join:
+            return Response(
+                {'message': 'Session is not started yet'},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response({'url': get_join_url(session, user)})
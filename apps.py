@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GroupCoursesConfig(AppConfig):
     name = 'edutailors.apps.group_courses'
     verbose_name = 'Group Courses'
+
+    def ready(self):
+        import edutailors.apps.group_courses.signals  # noqa: F401
@@ -0,0 +1,73 @@
+"""
+Session id generation and keyed inserts/joins, old scheme against new.
+
+    python -m edutailors.apps.group_courses.benchmarks.bench_session_ids
+"""
+import os
+import random
+import sqlite3
+import string
+import time
+import uuid
+
+COUNT = 100000
+
+
+def old_random_id(size=32):
+    return ''.join(
+        [random.choice(string.ascii_letters + string.digits)
+         for _ in range(size)])
+
+
+def new_random_id():
+    return uuid.uuid4().hex
+
+
+def new_random_ids(count, size=32):
+    width = (size + 1) // 2 * 2
+    data = os.urandom(count * width // 2).hex()
+    return [data[i:i + size] for i in range(0, count * width, width)]
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def insert_and_join(ids):
+    db = sqlite3.connect(':memory:')
+    db.execute('create table session (id varchar(40) primary key)')
+    db.execute(
+        'create table session_student (id integer primary key, '
+        'session_id varchar(40) references session(id))')
+    db.execute('create index session_id_idx on session_student(session_id)')
+    _, insert = timed(lambda: (
+        db.executemany('insert into session values (?)',
+                       ((id,) for id in ids)),
+        db.executemany('insert into session_student (session_id) values (?)',
+                       ((id,) for id in ids)),
+    ))
+    _, join = timed(lambda: db.execute(
+        'select count(*) from session_student '
+        'join session on session.id = session_student.session_id',
+    ).fetchone())
+    return insert, join
+
+
+def main():
+    old_ids, old_time = timed(lambda: [old_random_id() for _ in range(COUNT)])
+    _, new_time = timed(lambda: [new_random_id() for _ in range(COUNT)])
+    new_ids, bulk_time = timed(lambda: new_random_ids(COUNT))
+    print(f'{COUNT} ids with random.choice: {old_time * 1000:.1f} ms')
+    print(f'{COUNT} ids with uuid4: {new_time * 1000:.1f} ms')
+    print(f'{COUNT} ids with one urandom call: {bulk_time * 1000:.1f} ms')
+
+    for name, ids in (('old', old_ids), ('new', new_ids)):
+        insert, join = insert_and_join(ids)
+        print(f'{name} ids: insert {insert * 1000:.1f} ms, '
+              f'join {join * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
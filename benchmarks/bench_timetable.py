@@ -0,0 +1,64 @@
+"""
+Conflict checks against an in-memory timetable of 100k sessions.
+
+    python -m edutailors.apps.group_courses.benchmarks.bench_timetable
+"""
+import random
+import time
+from datetime import datetime, timedelta
+
+from edutailors.apps.group_courses.timetable import Timetable
+
+SESSIONS = 100000
+TEACHERS = 1000
+CHECKS = 100000
+
+
+def random_sessions(count, teachers):
+    origin = datetime(2020, 1, 1)
+    for number in range(count):
+        start = origin + timedelta(minutes=random.randrange(0, 525600, 15))
+        end = start + timedelta(minutes=random.choice((45, 60, 90)))
+        yield random.randrange(teachers), start, end, number
+
+
+def linear_overlaps(sessions, teacher, start, end):
+    return any(
+        person == teacher and s < end and start < e
+        for person, s, e, _ in sessions
+    )
+
+
+def main():
+    random.seed(0)
+    sessions = sorted(random_sessions(SESSIONS, TEACHERS),
+                      key=lambda row: row[1])
+    checks = list(random_sessions(CHECKS, TEACHERS))
+
+    started = time.perf_counter()
+    timetable = Timetable()
+    for teacher, start, end, key in sessions:
+        timetable.add((teacher,), start, end, key)
+    build = time.perf_counter() - started
+
+    started = time.perf_counter()
+    found = sum(
+        timetable.overlaps((teacher,), start, end)
+        for teacher, start, end, _ in checks
+    )
+    indexed = time.perf_counter() - started
+
+    sample = checks[:100]
+    started = time.perf_counter()
+    for teacher, start, end, _ in sample:
+        linear_overlaps(sessions, teacher, start, end)
+    linear = (time.perf_counter() - started) / len(sample) * CHECKS
+
+    print(f'build {SESSIONS} sessions: {build * 1000:.1f} ms')
+    print(f'{CHECKS} indexed checks: {indexed * 1000:.1f} ms '
+          f'({found} conflicts)')
+    print(f'{CHECKS} linear checks (extrapolated): {linear * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
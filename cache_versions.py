@@ -0,0 +1,20 @@
+import uuid
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """
+    Version token stored under `key`, a new one if it is missing.
+    Tokens never repeat, so bodies cached under a version evicted from
+    the cache can not be served again.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    cache.set(key, uuid.uuid4().hex, None)
@@ -0,0 +1,162 @@
+from datetime import timezone
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+
+from edutailors.apps.group_courses.cache_versions import (
+    bump_version, get_version,
+)
+from edutailors.apps.group_courses.models import Session, SessionStudent
+
+STUDENT = 'student'
+TEACHER = 'teacher'
+# profile of the user owning each kind of feed
+OWNER_PROFILES = {
+    STUDENT: 'student_profile',
+    TEACHER: 'teacher_profile',
+}
+CALENDAR_CACHE_TIMEOUT = 60 * 60 * 24
+ICAL_DATE_FORMAT = '%Y%m%dT%H%M%SZ'
+FEED_TOKEN_SALT = 'group_courses.calendars.feed'
+
+
+def get_version_key(kind, owner_id):
+    return f'group_courses:calendar:{kind}:{owner_id}:version'
+
+
+def get_owner_id(kind, user):
+    """Profile id owning the `kind` feed of a user, None without one."""
+    profile = getattr(user, OWNER_PROFILES[kind], None)
+    return profile.id if profile is not None else None
+
+
+def get_feed_token(kind, owner_id):
+    """
+    Secret part of the feed URL. Calendar clients can not send the API
+    credentials, the signed token identifies the feed instead.
+    """
+    return signing.dumps([kind, owner_id], salt=FEED_TOKEN_SALT)
+
+
+def get_feed_owner(token):
+    """(kind, owner id) of a feed token, None if it is not valid."""
+    try:
+        kind, owner_id = signing.loads(token, salt=FEED_TOKEN_SALT)
+    except (signing.BadSignature, TypeError, ValueError):
+        return None
+    if kind not in OWNER_PROFILES:
+        return None
+    return kind, owner_id
+
+
+def get_calendar_version(kind, owner_id):
+    return get_version(get_version_key(kind, owner_id))
+
+
+def invalidate_calendars(kind, owner_ids):
+    for owner_id in set(owner_ids):
+        if owner_id is None:
+            continue
+        bump_version(get_version_key(kind, owner_id))
+
+
+def invalidate_session_calendars(session_ids):
+    """Drop cached feeds of everyone attending or teaching the sessions."""
+    invalidate_calendars(STUDENT, SessionStudent.objects.filter(
+        session_id__in=session_ids,
+    ).values_list('student_id', flat=True))
+    people = Session.objects.filter(id__in=session_ids).values_list(
+        'lecture__course__teacher_id', 'lecture__course__assistant_id')
+    invalidate_calendars(
+        TEACHER, [person for row in people for person in row])
+
+
+def get_calendar_sessions(kind, owner_id):
+    if kind == STUDENT:
+        sessions = Session.objects.filter(session_student__student=owner_id)
+    else:
+        sessions = Session.objects.filter(
+            Q(lecture__course__teacher=owner_id)
+            | Q(lecture__course__assistant=owner_id),
+        )
+    return sessions.select_related('lecture__course').order_by('start_date')
+
+
+def format_date(value):
+    return value.astimezone(timezone.utc).strftime(ICAL_DATE_FORMAT)
+
+
+def escape(text):
+    return (
+        (text or '').replace('\\', '\\\\').replace(';', '\\;')
+        .replace(',', '\\,').replace('\n', '\\n')
+    )
+
+
+def fold(line):
+    # content lines are limited to 75 octets, continuations start
+    # with a space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_events(sessions):
+    for session in sessions.iterator():
+        lecture = session.lecture
+        lines = (
+            'BEGIN:VEVENT',
+            f'UID:{session.id}@edutailors',
+            f'DTSTAMP:{format_date(session.updated)}',
+            f'DTSTART:{format_date(session.start_date)}',
+            f'DTEND:{format_date(session.end_date)}',
+            'SUMMARY:{}'.format(
+                escape(f'{lecture.course.title}: {lecture.title}')),
+            'DESCRIPTION:{}'.format(
+                escape(session.description or lecture.description)),
+            'END:VEVENT',
+        )
+        yield ''.join(fold(line) for line in lines)
+
+
+def iter_calendar(sessions):
+    yield (
+        'BEGIN:VCALENDAR\r\n'
+        'VERSION:2.0\r\n'
+        'PRODID:-//Edutailors//Group Courses//EN\r\n'
+        'CALSCALE:GREGORIAN\r\n'
+    )
+    yield from iter_events(sessions)
+    yield 'END:VCALENDAR\r\n'
+
+
+def get_calendar_feed(kind, owner_id):
+    """
+    Return (etag, chunks) of the iCal feed of a student or a teacher.
+    A cached feed is reused until one of its sessions changes,
+    otherwise the feed is streamed and cached on the way out.
+    """
+    version = get_calendar_version(kind, owner_id)
+    etag = f'"{kind}-{owner_id}-{version}"'
+    body_key = f'group_courses:calendar:{kind}:{owner_id}:{version}'
+    body = cache.get(body_key)
+    if body is not None:
+        return etag, [body]
+
+    def stream():
+        chunks = []
+        for chunk in iter_calendar(get_calendar_sessions(kind, owner_id)):
+            chunks.append(chunk)
+            yield chunk
+        cache.set(body_key, ''.join(chunks), CALENDAR_CACHE_TIMEOUT)
+
+    return etag, stream()
@@ -1,8 +1,92 @@
+import datetime
+import os
+from functools import lru_cache
+
+from botocore.signers import CloudFrontSigner
 from storages.backends.s3boto3 import S3Boto3Storage
 
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now
+
+# documents are stored under unique keys and never rewritten,
+# so clients and the CDN may keep them forever
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+SIGNED_URL_LIFETIME = getattr(
+    settings, 'AWS_CLOUDFRONT_SIGNED_URL_LIFETIME', 60 * 60 * 24 * 7)
+
+
+@lru_cache(maxsize=None)
+def get_cloudfront_signer():
+    key_id = getattr(settings, 'AWS_CLOUDFRONT_KEY_ID', None)
+    private_key = getattr(settings, 'AWS_CLOUDFRONT_KEY', None)
+    if not key_id or not private_key:
+        return None
+
+    from cryptography.hazmat.backends import default_backend
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import padding
+
+    if isinstance(private_key, str):
+        private_key = private_key.encode()
+    key = serialization.load_pem_private_key(
+        private_key, password=None, backend=default_backend())
+
+    def rsa_signer(message):
+        return key.sign(message, padding.PKCS1v15(), hashes.SHA1())
+
+    return CloudFrontSigner(key_id, rsa_signer)
 
 
 class S3Storage(S3Boto3Storage):
     bucket_name = settings.AWS_STORAGE_BUCKET_NAME
-    default_acl = 'public-read'
+    # documents are only reachable through signed urls
+    default_acl = 'private'
+    querystring_auth = True
+    querystring_expire = SIGNED_URL_LIFETIME
+    cloudfront_domain = getattr(settings, 'AWS_CLOUDFRONT_DOMAIN', None)
+
+    def _get_write_parameters(self, name, content=None):
+        params = super()._get_write_parameters(name, content)
+        params.setdefault('CacheControl', IMMUTABLE_CACHE_CONTROL)
+        params.setdefault(
+            'ContentDisposition',
+            'inline; filename="{}"'.format(os.path.basename(name)),
+        )
+        return params
+
+    def get_expire_date(self, at=None):
+        # the expiry is the end of the next lifetime window, so every
+        # request inside one window gets the very same (cacheable) url,
+        # valid for at least one more lifetime
+        timestamp = int((at or now()).timestamp())
+        window_end = (timestamp // SIGNED_URL_LIFETIME + 2) \
+            * SIGNED_URL_LIFETIME
+        return datetime.datetime.utcfromtimestamp(window_end)
+
+    def signed_url(self, name):
+        """
+        CloudFront signed url for `name`. It is cached until the end
+        of the current window, so a url is never handed out with less
+        than SIGNED_URL_LIFETIME left. Falls back to the storage url,
+        signed by S3, if CloudFront is not configured.
+        """
+        signer = get_cloudfront_signer()
+        if not self.cloudfront_domain or signer is None:
+            return self.url(name)
+
+        cache_key = f'group_courses:signed_url:{name}'
+        url = cache.get(cache_key)
+        if url is None:
+            current = now()
+            expire_date = self.get_expire_date(current)
+            url = signer.generate_presigned_url(
+                f'https://{self.cloudfront_domain}/{name}',
+                date_less_than=expire_date,
+            )
+            remaining = expire_date.replace(
+                tzinfo=datetime.timezone.utc) - current
+            timeout = int(remaining.total_seconds()) - SIGNED_URL_LIFETIME
+            if timeout > 0:
+                cache.set(cache_key, url, timeout)
+        return url
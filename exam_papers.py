@@ -0,0 +1,81 @@
+import json
+
+from django.core.cache import cache
+from django.db.models import Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from edutailors.apps.group_courses.api.serializers import ExamPaperSerializer
+from edutailors.apps.group_courses.cache_versions import (
+    bump_version, get_version,
+)
+from edutailors.apps.group_courses.models import (
+    Assessment, AssessmentChoice, AssessmentQuestion,
+)
+
+EXAM_PAPER_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_version_key(assessment_id):
+    return f'group_courses:exam_paper:{assessment_id}:version'
+
+
+def get_body_key(assessment_id, version):
+    return f'group_courses:exam_paper:{assessment_id}:{version}'
+
+
+def invalidate_exam_paper(assessment_id):
+    bump_version(get_version_key(assessment_id))
+
+
+def render_exam_paper(assessment_id):
+    """
+    JSON of the enabled questions and choices of an assessment, without
+    is_valid or anybody's answers. None if the assessment is missing.
+    """
+    assessment = Assessment.objects.filter(
+        id=assessment_id, enabled=True,
+    ).prefetch_related(
+        Prefetch(
+            'questions',
+            queryset=AssessmentQuestion.objects.filter(enabled=True),
+        ),
+        Prefetch(
+            'questions__choices',
+            queryset=AssessmentChoice.objects.filter(enabled=True),
+        ),
+    ).first()
+    if assessment is None:
+        return None
+    return JSONRenderer().render(ExamPaperSerializer(assessment).data)
+
+
+def get_exam_paper(assessment_id):
+    """
+    Rendered exam paper of an assessment, shared by all students.
+    It is rendered on the first request after a change and then
+    served from the cache.
+    """
+    version = get_version(get_version_key(assessment_id))
+    body_key = get_body_key(assessment_id, version)
+    body = cache.get(body_key)
+    if body is None:
+        body = render_exam_paper(assessment_id)
+        if body is not None:
+            cache.set(body_key, body, EXAM_PAPER_CACHE_TIMEOUT)
+    return body
+
+
+def get_student_exam_paper(assessment_id, student_id):
+    """
+    Exam paper JSON with the choices the student selected so far.
+    The cached paper is spliced in as it is, without parsing it.
+    """
+    paper = get_exam_paper(assessment_id)
+    if paper is None:
+        return None
+    selected_choices = json.dumps(
+        Assessment(id=assessment_id).get_answer_map(student_id))
+    return b''.join((
+        b'{"paper":', paper,
+        b',"selected_choices":', selected_choices.encode(), b'}',
+    ))
@@ -0,0 +1,87 @@
+import csv
+import io
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+
+from edutailors.apps.group_courses.models import Assessment, GradebookEntry
+
+CSV = 'csv'
+XLSX = 'xlsx'
+CHUNK_SIZE = 2000
+STUDENT_FIELDS = ('first_name', 'last_name', 'email')
+GRADE_FIELDS = ('score', 'attempt', 'passed')
+
+
+def get_assessments(course):
+    return list(Assessment.objects.filter(
+        course=course,
+    ).order_by('start_date', 'id').values('id', 'title', 'total_score'))
+
+
+def iter_students(course):
+    """
+    Yield every graded student of the course with their grades by
+    assessment id. The whole grid is read with one streaming query.
+    """
+    rows = GradebookEntry.objects.filter(course=course).order_by(
+        'student_id', 'assessment_id',
+    ).values_list(
+        'student_id',
+        *[f'student__user__{field}' for field in STUDENT_FIELDS],
+        'assessment_id', *GRADE_FIELDS,
+    )
+    for student_id, entries in groupby(
+        rows.iterator(chunk_size=CHUNK_SIZE), key=itemgetter(0),
+    ):
+        entries = list(entries)
+        student = dict(zip(STUDENT_FIELDS, entries[0][1:4]))
+        student['id'] = student_id
+        student['grades'] = {
+            entry[4]: dict(zip(GRADE_FIELDS, entry[5:]))
+            for entry in entries
+        }
+        yield student
+
+
+def iter_rows(course):
+    """Header and one flat row per student, for the file exports."""
+    assessments = get_assessments(course)
+    yield list(STUDENT_FIELDS) + [
+        f'{assessment["title"]} {field}'
+        for assessment in assessments for field in GRADE_FIELDS
+    ]
+    for student in iter_students(course):
+        row = [student[field] for field in STUDENT_FIELDS]
+        for assessment in assessments:
+            grade = student['grades'].get(assessment['id'], {})
+            row.extend(grade.get(field, '') for field in GRADE_FIELDS)
+        yield row
+
+
+def export_csv(course):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in iter_rows(course):
+        writer.writerow(row)
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        yield value
+
+
+def export_xlsx(course):
+    """
+    Write the gradebook to a temporary XLSX file and return it.
+    Needs the optional openpyxl package.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Gradebook')
+    for row in iter_rows(course):
+        sheet.append(row)
+    file = tempfile.TemporaryFile()
+    workbook.save(file)
+    file.seek(0)
+    return file
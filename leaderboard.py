@@ -0,0 +1,131 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+from django.conf import settings
+
+from edutailors.apps.group_courses.models import GradebookEntry
+
+# indexes are rebuilt from the gradebook at most this often, writes
+# made by other processes show up within that time
+LEADERBOARD_TTL = getattr(settings, 'GROUP_COURSES_LEADERBOARD_TTL', 60)
+
+# score indexes of this process, by assessment id
+_indexes = {}
+# changes recorded while an index is loaded from the gradebook, and
+# the locks letting one thread load each index
+_pending = {}
+_load_locks = {}
+_lock = threading.Lock()
+
+
+class ScoreIndex:
+    """Scores of one assessment kept sorted, one score per student."""
+
+    def __init__(self, scores=None):
+        self.scores = dict(scores or {})
+        self.sorted_scores = sorted(self.scores.values())
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.sorted_scores)
+
+    def is_stale(self):
+        return time.monotonic() - self.built_at > LEADERBOARD_TTL
+
+    def update(self, student_id, score):
+        self.remove(student_id)
+        self.scores[student_id] = score
+        insort(self.sorted_scores, score)
+
+    def remove(self, student_id):
+        score = self.scores.pop(student_id, None)
+        if score is not None:
+            del self.sorted_scores[bisect_left(self.sorted_scores, score)]
+
+    def apply(self, student_id, score):
+        """Update the score of a student, None removes the student."""
+        if score is None:
+            self.remove(student_id)
+        else:
+            self.update(student_id, score)
+
+    def rank(self, score):
+        """1 + the number of strictly better scores."""
+        return len(self) - bisect_right(self.sorted_scores, score) + 1
+
+    def percentile(self, score):
+        """Share of participants scoring the same or lower."""
+        if not self.sorted_scores:
+            return 100.0
+        return bisect_right(self.sorted_scores, score) * 100 / len(self)
+
+    @classmethod
+    def load(cls, assessment_id):
+        return cls(GradebookEntry.objects.filter(
+            assessment_id=assessment_id,
+        ).values_list('student_id', 'score'))
+
+
+def get_index(assessment_id):
+    """
+    Score index of an assessment, reloaded once it is stale. One thread
+    loads it while the others wait, scores recorded during the load are
+    applied before it is installed.
+    """
+    with _lock:
+        index = _indexes.get(assessment_id)
+        if index is not None and not index.is_stale():
+            return index
+        load_lock = _load_locks.setdefault(assessment_id, threading.Lock())
+    with load_lock:
+        with _lock:
+            index = _indexes.get(assessment_id)
+            if index is not None and not index.is_stale():
+                # another thread loaded it meanwhile
+                return index
+            _pending[assessment_id] = []
+        try:
+            index = ScoreIndex.load(assessment_id)
+        except Exception:
+            with _lock:
+                del _pending[assessment_id]
+            raise
+        with _lock:
+            for student_id, score in _pending.pop(assessment_id):
+                index.apply(student_id, score)
+            _indexes[assessment_id] = index
+    return index
+
+
+def _record_change(assessment_id, student_id, score):
+    with _lock:
+        index = _indexes.get(assessment_id)
+        if index is not None:
+            index.apply(student_id, score)
+        if assessment_id in _pending:
+            _pending[assessment_id].append((student_id, score))
+
+
+def record_score(assessment_id, student_id, score):
+    _record_change(assessment_id, student_id, score)
+
+
+def remove_score(assessment_id, student_id):
+    _record_change(assessment_id, student_id, None)
+
+
+def get_standing(assessment_id, student_id, score):
+    """
+    Rank, percentile and number of participants of a student who just
+    got `score`, in O(log n) once the index is loaded.
+    """
+    index = get_index(assessment_id)
+    with _lock:
+        if index.scores.get(student_id) != score:
+            index.update(student_id, score)
+        return {
+            'rank': index.rank(score),
+            'percentile': round(index.percentile(score), 1),
+            'participants': len(index),
+        }
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from edutailors.apps.group_courses.meeting_rooms import (
+    PROVISION_HOURS, provision_rooms,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create meeting rooms for sessions starting soon'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=PROVISION_HOURS,
+            help='Provision sessions starting within this many hours',
+        )
+
+    def handle(self, *args, **options):
+        created = provision_rooms(options['hours'])
+        self.stdout.write(f'Created {created} meeting rooms')
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from edutailors.apps.group_courses.custom_storage import S3Storage
+from edutailors.apps.group_courses.models import Material
+from edutailors.apps.group_courses.previews import generate_previews
+
+DOCUMENTS_DIRECTORY = 'group-courses/documents'
+UPLOAD_WORKERS = getattr(settings, 'GROUP_COURSES_UPLOAD_WORKERS', 4)
+# members bigger than this are spooled to disk while waiting for upload
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+# limits of one archive, its size is counted uncompressed
+MAX_ARCHIVE_MEMBERS = getattr(
+    settings, 'GROUP_COURSES_IMPORT_MAX_MEMBERS', 500)
+MAX_ARCHIVE_SIZE = getattr(
+    settings, 'GROUP_COURSES_IMPORT_MAX_SIZE', 512 * 1024 * 1024)
+
+
+def get_unique_file_path(file_name):
+    name, file_format = os.path.splitext(os.path.basename(file_name))
+    new_unique_file_name = f'{name}-{uuid.uuid4().hex}{file_format}'
+    return os.path.join(DOCUMENTS_DIRECTORY, new_unique_file_name)
+
+
+def check_archive_limits(count, size):
+    if count > MAX_ARCHIVE_MEMBERS:
+        raise ValidationError(
+            f'archive should have at most {MAX_ARCHIVE_MEMBERS} files')
+    if size > MAX_ARCHIVE_SIZE:
+        raise ValidationError(
+            f'archive should be at most {MAX_ARCHIVE_SIZE} bytes '
+            f'uncompressed')
+
+
+def iter_archive_members(archive):
+    """
+    Yield (name, file) for every regular file of a zip or tar archive.
+    Members are read one at a time, the archive is never extracted
+    as a whole. Raises ValidationError before reading past the member
+    count or uncompressed size limits.
+    """
+    archive.seek(0)
+    if zipfile.is_zipfile(archive):
+        archive.seek(0)
+        with zipfile.ZipFile(archive) as zip_archive:
+            # the central directory lists every member up front, and
+            # members are never decompressed past their listed size
+            infos = [
+                info for info in zip_archive.infolist() if not info.is_dir()
+            ]
+            check_archive_limits(
+                len(infos), sum(info.file_size for info in infos))
+            for info in infos:
+                with zip_archive.open(info) as member:
+                    yield info.filename, member
+    else:
+        archive.seek(0)
+        count = size = 0
+        with tarfile.open(fileobj=archive, mode='r|*') as tar_archive:
+            # a tar stream is only known member by member
+            for info in tar_archive:
+                if not info.isfile():
+                    continue
+                count += 1
+                size += info.size
+                check_archive_limits(count, size)
+                yield info.name, tar_archive.extractfile(info)
+
+
+def is_hidden(name):
+    return any(
+        part.startswith('.') or part == '__MACOSX'
+        for part in name.split('/')
+    )
+
+
+def upload_archive(archive, s3_storage):
+    """
+    Upload every document of the archive to the bucket, at most
+    UPLOAD_WORKERS at a time. Returns a list of (original name, path).
+    """
+    slots = threading.BoundedSemaphore(UPLOAD_WORKERS * 2)
+
+    def upload(path, content):
+        try:
+            s3_storage.save(path, content)
+        finally:
+            content.close()
+            slots.release()
+
+    uploads = []
+    error = None
+    with ThreadPoolExecutor(max_workers=UPLOAD_WORKERS) as executor:
+        try:
+            for name, member in iter_archive_members(archive):
+                if is_hidden(name):
+                    continue
+                # a tar stream can not be read concurrently, so every
+                # member is copied out before its upload is scheduled
+                content = tempfile.SpooledTemporaryFile(
+                    max_size=SPOOL_MAX_SIZE)
+                shutil.copyfileobj(member, content)
+                content.seek(0)
+                path = get_unique_file_path(name)
+                slots.acquire()
+                future = executor.submit(upload, path, content)
+                uploads.append((name, path, future))
+        except Exception as e:
+            error = e
+
+    uploaded = [(name, path) for name, path, future in uploads
+                if not future.exception()]
+    if error is None and len(uploaded) != len(uploads):
+        error = next(
+            future.exception() for _, _, future in uploads
+            if future.exception())
+    if error is not None:
+        for _, path in uploaded:
+            s3_storage.delete(path)
+        raise error
+    return uploaded
+
+
+def validate_subcategory(subcategory):
+    for field_name, value in subcategory.items():
+        choices = dict(Material._meta.get_field(field_name).choices)
+        if value not in choices:
+            raise ValidationError(
+                f'{value} is not a valid {field_name} subcategory')
+
+
+def import_materials(course, archive, description='', **subcategory):
+    """
+    Create a material for every document of the archive.
+    `subcategory` holds at most one of sat/gmat/gre for the whole batch,
+    it must already be validated against the course.
+    """
+    validate_subcategory(subcategory)
+    s3_storage = S3Storage()
+    uploaded = upload_archive(archive, s3_storage)
+    materials = [
+        Material(
+            course=course,
+            title=os.path.splitext(os.path.basename(name))[0],
+            description=description,
+            # documents are private, MaterialSerializer signs the path
+            document='',
+            file_path_within_bucket=path,
+            **subcategory,
+        )
+        for name, path in uploaded
+    ]
+    paths = [path for _, path in uploaded]
+    try:
+        with transaction.atomic():
+            Material.objects.bulk_create(materials)
+            if subcategory and course.material_type is None:
+                course.update_material_type()
+            # bulk_create skips post_save, so previews are scheduled here
+            materials = list(
+                Material.objects.filter(file_path_within_bucket__in=paths))
+            transaction.on_commit(lambda: [
+                generate_previews(material) for material in materials])
+    except Exception:
+        # nothing references the uploaded documents
+        for path in paths:
+            s3_storage.delete(path)
+        raise
+    return materials
@@ -0,0 +1,107 @@
+from random import choice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.timezone import now, timedelta
+
+from edutailors.apps.big_blue_button.models import MeetingRoom
+from edutailors.apps.group_courses.models import Session
+
+TEACHER = 'teacher'
+ASSISTANT = 'assistant'
+STUDENT = 'student'
+PROVISION_HOURS = getattr(settings, 'GROUP_COURSES_PROVISION_HOURS', 24)
+
+
+def generate_password(size=32):
+    return ''.join(
+        [choice('abcdefghijklmnopqrstuvwxyz0123456789%*-')
+         for i in range(size)],
+    )
+
+
+def get_room_defaults(session):
+    course = session.lecture.course
+    return {
+        'name': '{}: {}'.format(
+            course.teacher.user.get_full_name(),
+            session.lecture.title),
+        'attendee_password': generate_password(),
+        'moderator_password': generate_password(),
+    }
+
+
+def provision_rooms(hours=PROVISION_HOURS):
+    """
+    Create meeting rooms for every session starting in the next `hours`
+    with one bulk insert, so nobody waits for room creation when the
+    session starts. Returns the number of created rooms.
+    """
+    current = now()
+    sessions = Session.objects.filter(
+        start_date__gte=current,
+        start_date__lte=current + timedelta(hours=hours),
+    ).exclude(
+        id__in=MeetingRoom.objects.filter(
+            lesson_type=MeetingRoom.GROUP_COURSE,
+        ).values('meeting_id'),
+    ).select_related('lecture__course__teacher__user')
+    rooms = [
+        MeetingRoom(
+            meeting_id=session.id,
+            lesson_type=MeetingRoom.GROUP_COURSE,
+            group_session=session,
+            **get_room_defaults(session),
+        )
+        for session in sessions
+    ]
+    MeetingRoom.objects.bulk_create(rooms)
+    return len(rooms)
+
+
+def get_room(session):
+    room, created = MeetingRoom.objects.get_or_create(
+        meeting_id=session.id,
+        defaults=get_room_defaults(session),
+        lesson_type=MeetingRoom.GROUP_COURSE,
+        group_session=session,
+    )
+    return room
+
+
+def get_role(session, user):
+    course = session.lecture.course
+    if user.id == course.teacher.user_id:
+        return TEACHER
+    if course.assistant and user.id == course.assistant.user_id:
+        return ASSISTANT
+    return STUDENT
+
+
+def get_join_url(session, user):
+    """
+    Join url of a session for a user, cached until the session ends.
+    Teacher and assistant urls are cached per role, student urls
+    carry the student name and are cached per user.
+    """
+    role = get_role(session, user)
+    owner = user.id if role == STUDENT else role
+    cache_key = f'group_courses:join_url:{session.id}:{owner}'
+    url = cache.get(cache_key)
+    if url is not None:
+        return url
+
+    room = get_room(session)
+    full_name = user.get_full_name()
+    if role == TEACHER:
+        full_name = 'Teacher: ' + full_name
+        password = room.moderator_password
+    elif role == ASSISTANT:
+        full_name = 'Assistant: ' + full_name
+        password = room.moderator_password
+    else:
+        password = room.attendee_password
+    url = room.join_url(full_name, password)
+    timeout = max(int((session.end_date - now()).total_seconds()), 60)
+    cache.set(cache_key, url, timeout)
+    return url
@@ -0,0 +1,23 @@
+# Generated by Django 2.0.1 on 2026-10-19 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0058_auto_20201104_1404'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='material',
+            name='preview_path_within_bucket',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='material',
+            name='thumbnail_path_within_bucket',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.0.1 on 2026-10-19 11:03
+
+from django.db import migrations, models
+
+
+def fill_material_type(apps, schema_editor):
+    Course = apps.get_model('group_courses', 'Course')
+    Material = apps.get_model('group_courses', 'Material')
+    for sub in ('sat', 'gre', 'gmat'):
+        course_ids = Material.objects.filter(
+            **{f'{sub}__isnull': False},
+        ).values('course_id')
+        Course.objects.filter(id__in=course_ids).update(material_type=sub)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0059_material_previews'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='material_type',
+            field=models.CharField(blank=True, choices=[('sat', 'SAT'), ('gmat', 'GMAT'), ('gre', 'GRE')], editable=False, max_length=10, null=True),
+        ),
+        migrations.RunPython(fill_material_type, migrations.RunPython.noop),
+    ]
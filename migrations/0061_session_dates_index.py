@@ -0,0 +1,17 @@
+# Generated by Django 2.0.1 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0060_course_material_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(fields=['start_date', 'end_date'], name='group_cours_start_d_2904e0_idx'),
+        ),
+    ]
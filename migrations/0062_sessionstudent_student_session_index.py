@@ -0,0 +1,17 @@
+# Generated by Django 2.0.1 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0061_session_dates_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sessionstudent',
+            index=models.Index(fields=['student', 'session'], name='group_cours_student_fce2b7_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.0.1 on 2026-10-19 13:02
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0062_sessionstudent_student_session_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='capacity',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Course capacity is used if empty', null=True, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
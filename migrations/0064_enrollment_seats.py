@@ -0,0 +1,34 @@
+# Generated by Django 2.0.1 on 2026-10-19 13:40
+
+from django.db import migrations, models
+
+
+def fill_seats_taken(apps, schema_editor):
+    Course = apps.get_model('group_courses', 'Course')
+    courses = Course.objects.annotate(
+        enrollments_count=models.Count('enrollments'),
+    ).filter(enrollments_count__gt=0)
+    for course in courses.iterator():
+        Course.objects.filter(id=course.id).update(
+            seats_taken=course.enrollments_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0063_session_capacity'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='seats_taken',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='status',
+            field=models.CharField(choices=[('enrolled', 'enrolled'), ('waitlisted', 'waitlisted')], default='enrolled', editable=False, max_length=20),
+        ),
+        migrations.RunPython(fill_seats_taken, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.0.1 on 2026-10-19 14:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0064_enrollment_seats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='diagnostic_question_order',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='assessmentquestion',
+            index=models.Index(fields=['assessment', 'order'], name='group_cours_assessm_1ed96a_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.0.1 on 2026-10-19 15:08
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0065_diagnostic_question_order'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='difficulty',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmentquestion',
+            name='discrimination',
+            field=models.FloatField(default=1, validators=[django.core.validators.MinValueValidator(0.01)]),
+        ),
+        migrations.AddField(
+            model_name='enrollment',
+            name='diagnostic_ability',
+            field=models.FloatField(editable=False, null=True),
+        ),
+    ]
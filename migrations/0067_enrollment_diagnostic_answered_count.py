@@ -0,0 +1,39 @@
+# Generated by Django 2.0.1 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+def fill_diagnostic_progress(apps, schema_editor):
+    Enrollment = apps.get_model('group_courses', 'Enrollment')
+    AssessmentQuestion = apps.get_model('group_courses', 'AssessmentQuestion')
+    enrollments = Enrollment.objects.exclude(diagnostic_status='not_started')
+    for enrollment in enrollments.iterator():
+        progress = AssessmentQuestion.objects.filter(
+            assessment__course_id=enrollment.course_id,
+            assessment__assessment_type='diagnostic',
+            choices__answers__student_id=enrollment.student_id,
+        ).aggregate(
+            answered_count=models.Count('id', distinct=True),
+            question_order=models.Max('order'),
+        )
+        Enrollment.objects.filter(id=enrollment.id).update(
+            diagnostic_answered_count=progress['answered_count'],
+            diagnostic_question_order=progress['question_order'] or 0,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0066_adaptive_item_parameters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='enrollment',
+            name='diagnostic_answered_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            fill_diagnostic_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.0.1 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+def renumber_questions(apps, schema_editor):
+    Assessment = apps.get_model('group_courses', 'Assessment')
+    AssessmentQuestion = apps.get_model('group_courses', 'AssessmentQuestion')
+    for assessment in Assessment.objects.iterator():
+        questions = AssessmentQuestion.objects.filter(
+            assessment=assessment,
+        ).order_by('order', 'id').values_list('id', 'order')
+        count = 0
+        for count, (id, order) in enumerate(questions, start=1):
+            if order != count:
+                AssessmentQuestion.objects.filter(id=id).update(order=count)
+        Assessment.objects.filter(id=assessment.id).update(
+            questions_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('group_courses', '0067_enrollment_diagnostic_answered_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessment',
+            name='questions_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(renumber_questions, migrations.RunPython.noop),
+    ]
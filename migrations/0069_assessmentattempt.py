@@ -0,0 +1,71 @@
+# Generated by Django 2.0.1 on 2026-10-19 17:10
+
+from django.db import migrations, models
+from django.db.models import Min
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def create_attempts(apps, schema_editor):
+    # answers given so far become the first attempt of every student
+    AssessmentAnswer = apps.get_model('group_courses', 'AssessmentAnswer')
+    AssessmentAttempt = apps.get_model('group_courses', 'AssessmentAttempt')
+    pairs = AssessmentAnswer.objects.filter(
+        choice__question__assessment__isnull=False,
+    ).values(
+        'choice__question__assessment_id', 'student_id',
+    ).annotate(started_at=Min('created')).order_by()
+    for pair in pairs.iterator():
+        attempt = AssessmentAttempt.objects.create(
+            assessment_id=pair['choice__question__assessment_id'],
+            student_id=pair['student_id'],
+            number=1,
+            started_at=pair['started_at'],
+        )
+        AssessmentAnswer.objects.filter(
+            student_id=attempt.student_id,
+            choice__question__assessment_id=attempt.assessment_id,
+        ).update(attempt=attempt)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0097_auto_20200821_1451'),
+        ('group_courses', '0068_assessment_questions_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentAttempt',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated', models.DateTimeField(auto_now=True, db_index=True)),
+                ('number', models.PositiveSmallIntegerField(default=1)),
+                ('started_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attempts', to='group_courses.Assessment')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_attempts', to='profiles.StudentProfile')),
+            ],
+            options={
+                'verbose_name': 'Assessment Attempt',
+                'verbose_name_plural': 'Assessment Attempts',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='assessmentattempt',
+            unique_together={('assessment', 'student', 'number')},
+        ),
+        migrations.AddField(
+            model_name='assessmentanswer',
+            name='attempt',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='answers', to='group_courses.AssessmentAttempt'),
+        ),
+        migrations.AlterField(
+            model_name='assessment',
+            name='max_number_of_retries',
+            field=models.PositiveSmallIntegerField(default=1, help_text='Attempts a student may take'),
+        ),
+        migrations.RunPython(create_attempts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 2.0.1 on 2026-10-19 17:45
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.db.models.deletion
+
+PASS_PERCENT = 60
+
+
+def fill_gradebook(apps, schema_editor):
+    StudentScore = apps.get_model('group_courses', 'StudentScore')
+    AssessmentAttempt = apps.get_model('group_courses', 'AssessmentAttempt')
+    GradebookEntry = apps.get_model('group_courses', 'GradebookEntry')
+    # update_or_create used to match on the score too, so a student
+    # may have several scores for one assessment, the latest is kept
+    latest = {}
+    duplicates = []
+    for score in StudentScore.objects.select_related(
+        'assessment',
+    ).order_by('-updated', '-id').iterator():
+        key = (score.assessment_id, score.student_id)
+        if key in latest:
+            duplicates.append(score.id)
+        else:
+            latest[key] = score
+    StudentScore.objects.filter(id__in=duplicates).delete()
+
+    attempts = {
+        (row['assessment_id'], row['student_id']): row['number']
+        for row in AssessmentAttempt.objects.values(
+            'assessment_id', 'student_id',
+        ).annotate(number=Max('number')).order_by()
+    }
+    entries = []
+    for key, score in latest.items():
+        assessment = score.assessment
+        entries.append(GradebookEntry(
+            course_id=assessment.course_id,
+            assessment_id=score.assessment_id,
+            student_id=score.student_id,
+            score=score.score,
+            attempt=attempts.get(key, 1),
+            passed=(
+                assessment.assessment_type == 'diagnostic'
+                or score.score * 100 >= assessment.total_score * PASS_PERCENT
+            ),
+        ))
+    GradebookEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0097_auto_20200821_1451'),
+        ('group_courses', '0069_assessmentattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradebookEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated', models.DateTimeField(auto_now=True, db_index=True)),
+                ('score', models.IntegerField()),
+                ('attempt', models.PositiveSmallIntegerField(default=1)),
+                ('passed', models.BooleanField(default=False)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_entries', to='group_courses.Assessment')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook', to='group_courses.Course')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='gradebook_entries', to='profiles.StudentProfile')),
+            ],
+            options={
+                'verbose_name': 'Gradebook Entry',
+                'verbose_name_plural': 'Gradebook Entries',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='gradebookentry',
+            index=models.Index(fields=['course', 'student'], name='group_cours_course__c07ebc_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='gradebookentry',
+            unique_together={('assessment', 'student')},
+        ),
+        migrations.RunPython(fill_gradebook, migrations.RunPython.noop),
+    ]
@@ -1,25 +1,42 @@
-import string
-from random import choice
+import os
+import secrets
+import uuid
+from collections import defaultdict
+from datetime import timedelta
 
-from django.db import models
+from django.db import IntegrityError, models, transaction
 from django.conf import settings
 from django_extensions.db.fields import AutoSlugField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import ugettext_lazy as _
 from django.utils.timezone import now
-from django.db.models import Max
+from django.db.models import F, Q, Subquery
 from djchoices import DjangoChoices, ChoiceItem
 
 from s3direct.fields import S3DirectField
 
 from edutailors.apps.utils.other import TimedModel, edutailors_slugify
-from edutailors.apps.group_courses.querysets import LectureQuerySet
+from edutailors.apps.group_courses.querysets import (
+    JOIN_WINDOW_MINUTES, LectureQuerySet, SessionQuerySet,
+)
+from edutailors.apps.group_courses.timetable import (
+    get_course_people, overlapping_sessions,
+)
 
 
 def get_random_id(size=32):
-    return ''.join(
-        [choice(string.ascii_letters + string.digits) for _ in range(size)])
+    # 128 random bits from the OS generator, hex encoded
+    if size == 32:
+        return uuid.uuid4().hex
+    return secrets.token_hex((size + 1) // 2)[:size]
+
+
+def get_random_ids(count, size=32):
+    """Ids for `count` new sessions, read from os.urandom at once."""
+    width = (size + 1) // 2 * 2
+    data = os.urandom(count * width // 2).hex()
+    return [data[i:i + size] for i in range(0, count * width, width)]
 
 
 def get_duration(start_date, end_date):
@@ -35,6 +52,11 @@ class Course(TimedModel):
         (IN_PROGRESS, _('InProgress')),
         (FINISHED, _('Finished')),
     )
+    MATERIAL_TYPE = (
+        ('sat', 'SAT'),
+        ('gmat', 'GMAT'),
+        ('gre', 'GRE'),
+    )
 
     class LevelType(DjangoChoices):
         ALL_LEVELS = ChoiceItem('all_levels')
@@ -81,6 +103,8 @@ class Course(TimedModel):
         validators=[MinValueValidator(1)],
         default=5,
     )
+    seats_taken = models.PositiveSmallIntegerField(
+        default=0, editable=False)
     status = models.CharField(
         max_length=20,
         choices=STATUS_TYPE,
@@ -90,6 +114,14 @@ class Course(TimedModel):
     is_adaptive = models.BooleanField(
         default=False, verbose_name='Adaptive Course')
     test_drive = models.BooleanField(default=False)
+    # subcategory shared by all materials of the course,
+    # kept in sync by Material.save and the material_deleted receiver
+    material_type = models.CharField(
+        max_length=10,
+        choices=MATERIAL_TYPE,
+        null=True, blank=True,
+        editable=False,
+    )
 
     def __str__(self):
         return self.title
@@ -114,7 +146,14 @@ class Course(TimedModel):
             self.status = Course.FINISHED
         else:
             self.status = Course.IN_PROGRESS
+        previous_capacity = None
+        if not self._state.adding:
+            previous_capacity = Course.objects.filter(
+                id=self.id).values_list('capacity', flat=True).first()
         super(Course, self).save(*args, **kwargs)
+        if previous_capacity is not None and \
+                self.capacity > previous_capacity:
+            self.fill_seats()
 
     @property
     def get_average_rating(self):
@@ -124,6 +163,67 @@ class Course(TimedModel):
             avarage_ratings = [rating for rating in avarage_ratings if ratings]
             return sum(avarage_ratings) / len(avarage_ratings)
 
+    def update_material_type(self):
+        conditions = Q()
+        for sub in Material.SUBCATEGORIES:
+            conditions |= Q(**{f'{sub}__isnull': False})
+        material = self.materials.filter(conditions).first()
+        self.material_type = material.subcategory if material else None
+        Course.objects.filter(id=self.id).update(
+            material_type=self.material_type)
+
+    def reserve_seat(self):
+        # a conditional UPDATE, so concurrent enrollments
+        # can never take more seats than the course has
+        reserved = Course.objects.filter(
+            id=self.id,
+            seats_taken__lt=F('capacity'),
+        ).update(seats_taken=F('seats_taken') + 1)
+        return bool(reserved)
+
+    def release_seat(self):
+        Course.objects.filter(
+            id=self.id,
+            seats_taken__gt=0,
+        ).update(seats_taken=F('seats_taken') - 1)
+
+    def promote_waitlisted(self):
+        with transaction.atomic():
+            enrollment = Enrollment.objects.select_for_update(
+                skip_locked=True,
+            ).filter(
+                course=self,
+                status=Enrollment.StatusType.WAITLISTED,
+            ).order_by('created').first()
+            if enrollment and self.reserve_seat():
+                enrollment.create_session_students()
+                enrollment.status = Enrollment.StatusType.ENROLLED
+                enrollment.save(update_fields=['status', 'updated'])
+                return enrollment
+        return None
+
+    def fill_seats(self):
+        """Promote waitlisted students while seats are free."""
+        while self.promote_waitlisted():
+            pass
+
+    def is_taught_by(self, user):
+        """Whether the user is the teacher or the assistant."""
+        return Course.objects.filter(
+            Q(teacher__user=user) | Q(assistant__user=user),
+            id=self.id,
+        ).exists()
+
+    def is_managed_by(self, user):
+        """Whether the user is staff or teaches the course."""
+        return user.is_staff or self.is_taught_by(user)
+
+    def get_diagnostic_test(self):
+        return self.assessments.filter(
+            assessment_type=Assessment.DIAGNOSTIC,
+            is_valid=True,
+        ).first()
+
     def last_lecture_finished(self):
         sessions = Session.objects.filter(
             lecture__course=self,
@@ -171,6 +271,9 @@ class SessionStudent(TimedModel):
 
     class Meta:
         verbose_name_plural = 'Session_student'
+        indexes = [
+            models.Index(fields=['student', 'session']),
+        ]
 
     def save(self, *args, **kwargs):
         session_students = SessionStudent.objects.filter(
@@ -204,23 +307,67 @@ class Enrollment(TimedModel):
         default=DiagnosticStatusType.NOT_STARTED,
     )
     course_rated = models.BooleanField(default=False)
+    # diagnostic progress: order of the furthest answered question
+    # and the number of answered questions
+    diagnostic_question_order = models.PositiveSmallIntegerField(
+        default=0, editable=False)
+    diagnostic_answered_count = models.PositiveSmallIntegerField(
+        default=0, editable=False)
+    # ability estimated by the adaptive diagnostic test
+    diagnostic_ability = models.FloatField(null=True, editable=False)
+
+    class StatusType(DjangoChoices):
+        ENROLLED = ChoiceItem('enrolled')
+        WAITLISTED = ChoiceItem('waitlisted')
+
+    status = models.CharField(
+        max_length=20,
+        choices=StatusType.choices,
+        default=StatusType.ENROLLED,
+        editable=False,
+    )
 
     def __str__(self):
         return f'{self.course} - {self.student}'
 
+    def create_session_students(self):
+        for lecture in self.course.lectures.all():
+            session = lecture.sessions.filter(is_default=True).first()
+            if not session:
+                raise Exception('Sessions for lecture {}'
+                    ' are not created'.format(lecture))
+            params = {
+                'session': session,
+                'student': self.student,
+            }
+            SessionStudent.objects.create(**params)
+
     def save(self, *args, **kwargs):
-        if self._state.adding:
-            for lecture in self.course.lectures.all():
-                session = lecture.sessions.filter(is_default=True).first()
-                if not session:
-                    raise Exception('Sessions for lecture {}'
-                        ' are not created'.format(lecture))
-                params = {
-                    'session': session,
-                    'student': self.student,
-                }
-                SessionStudent.objects.create(**params)
-        super().save(*args, **kwargs)
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self.course.reserve_seat():
+                self.status = Enrollment.StatusType.ENROLLED
+                self.create_session_students()
+            else:
+                self.status = Enrollment.StatusType.WAITLISTED
+            super().save(*args, **kwargs)
+
+    def release(self):
+        """
+        Free the seat of a deleted enrollment and give it to the first
+        waitlisted student. Called for every way of deleting one.
+        """
+        if self.status != Enrollment.StatusType.ENROLLED:
+            return
+        course = Course(id=self.course_id)
+        with transaction.atomic():
+            course.release_seat()
+            SessionStudent.objects.filter(
+                session__lecture__course_id=self.course_id,
+                student_id=self.student_id,
+            ).delete()
+        course.promote_waitlisted()
 
 
 class Material(TimedModel):
@@ -234,6 +381,10 @@ class Material(TimedModel):
     enabled = models.BooleanField(default=True)
     file_path_within_bucket = models.CharField(
         max_length=255, null=True, blank=True)
+    thumbnail_path_within_bucket = models.CharField(
+        max_length=255, null=True, blank=True)
+    preview_path_within_bucket = models.CharField(
+        max_length=255, null=True, blank=True)
 
     class GMATType(DjangoChoices):
         analytical_writing_assessment = ChoiceItem(
@@ -283,22 +434,35 @@ class Material(TimedModel):
     def __str__(self):
         return f'Material ({self.id}) course({self.course.id})'
 
+    SUBCATEGORIES = ('sat', 'gmat', 'gre')
+
     def clean(self):
-        SUBCATEGORIES = ['sat', 'gmat', 'gre']
-        subcategory_list = [getattr(self, sub) for sub in SUBCATEGORIES]
+        subcategory_list = [getattr(self, sub) for sub in self.SUBCATEGORIES]
         subcategory_list = [sub for sub in subcategory_list if sub]
         if len(subcategory_list) > 1:
             raise ValidationError('You need add only 1 subcategory')
-        existing_subs = []
         added_sub = None
-        for sub in SUBCATEGORIES:
-            params = {f'{sub}__isnull': False}
-            if self.course.materials.filter(**params).exists():
-                existing_subs.append(sub)
+        for sub in self.SUBCATEGORIES:
             if getattr(self, sub):
                 added_sub = sub
+        self.validate_course_subcategory(self.course, added_sub)
+
+    def save(self, *args, **kwargs):
+        super(Material, self).save(*args, **kwargs)
+        if self.course.material_type != self.subcategory:
+            self.course.update_material_type()
 
-        if existing_subs and added_sub not in existing_subs:
+    @property
+    def subcategory(self):
+        for sub in self.SUBCATEGORIES:
+            if getattr(self, sub):
+                return sub
+        return None
+
+    @classmethod
+    def validate_course_subcategory(cls, course, added_sub):
+        existing_sub = course.material_type
+        if existing_sub and added_sub != existing_sub:
             raise ValidationError('In all materials can be only 1 subcategory')
 
 
@@ -381,6 +545,7 @@ class Assessment(TimedModel):
         (MIDTERM_EXAM, 'Midterm Exam'),
         (FINAL_EXAM, 'Final Exam'),
     )
+    PASS_PERCENT = 60
     course = models.ForeignKey(
         'Course', related_name='assessments',
         on_delete=models.CASCADE,
@@ -407,6 +572,8 @@ class Assessment(TimedModel):
         choices=ASSESSMENT_TYPE,
         default='quiz',
     )
+    # questions are ordered 1..questions_count without gaps
+    questions_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = 'Assessments'
@@ -427,12 +594,112 @@ class Assessment(TimedModel):
         self.duration = get_duration(self.start_date, self.end_date)
         super(Assessment, self).save(*args, **kwargs)
 
+    def lock(self):
+        """
+        Lock the assessment row until the end of the transaction
+        and return its current questions count.
+        """
+        return Assessment.objects.select_for_update().filter(
+            id=self.id,
+        ).values_list('questions_count', flat=True).get()
+
+    def reserve_question_orders(self, count=1):
+        """
+        Take `count` positions after the last question.
+        Returns the first one. Must run inside a transaction.
+        """
+        first_order = self.lock() + 1
+        Assessment.objects.filter(id=self.id).update(
+            questions_count=F('questions_count') + count)
+        self.questions_count = first_order + count - 1
+        return first_order
+
+    def renumber_questions(self):
+        """
+        Close the gaps left by deleted questions and store their count.
+        Questions after a gap are shifted with one UPDATE per gap.
+        Must run inside a transaction.
+        """
+        self.lock()
+        questions = AssessmentQuestion.objects.filter(
+            assessment_id=self.id,
+        ).order_by('order', 'id').values_list('id', 'order')
+        shifts = defaultdict(list)
+        count = 0
+        for count, (question_id, order) in enumerate(questions, 1):
+            if order != count:
+                shifts[order - count].append(question_id)
+        for shift, ids in shifts.items():
+            AssessmentQuestion.objects.filter(id__in=ids).update(
+                order=F('order') - shift)
+        Assessment.objects.filter(id=self.id).update(questions_count=count)
+        self.questions_count = count
+
+    def is_passed(self, score):
+        if self.assessment_type == self.DIAGNOSTIC:
+            return True
+        return score * 100 >= self.total_score * self.PASS_PERCENT
+
+    def get_latest_attempt(self, student_id):
+        attempt = AssessmentAttempt.objects.filter(
+            assessment=self, student_id=student_id,
+        ).order_by('-number').first()
+        if attempt:
+            attempt.assessment = self
+        return attempt
+
+    def latest_attempt_id(self, student_id):
+        """Subquery of the latest attempt id, to scope answers in SQL."""
+        return Subquery(AssessmentAttempt.objects.filter(
+            assessment=self, student_id=student_id,
+        ).order_by('-number').values('id')[:1])
+
+    @property
+    def max_attempts(self):
+        # the first attempt is not a retry
+        return self.max_number_of_retries + 1
+
+    def start_attempt(self, student_id):
+        """
+        Return the unsubmitted attempt of the student, or start the
+        next one if attempts are left. An attempt whose time limit is
+        over is submitted first.
+        """
+        attempt = self.get_latest_attempt(student_id)
+        if attempt and attempt.submitted_at is None:
+            if not attempt.is_expired():
+                return attempt
+            attempt.submit()
+        number = attempt.number + 1 if attempt else 1
+        if number > self.max_attempts:
+            raise ValidationError('No attempts left')
+        try:
+            with transaction.atomic():
+                return AssessmentAttempt.objects.create(
+                    assessment=self, student_id=student_id, number=number)
+        except IntegrityError:
+            # a concurrent request started it first
+            return self.get_latest_attempt(student_id)
+
     def get_selected_choices(self, student_id):
         return AssessmentChoice.objects.filter(
             answers__student=student_id,
+            answers__attempt=self.latest_attempt_id(student_id),
             question__assessment=self,
         )
 
+    def get_answer_map(self, student_id):
+        """{question id: [selected choice ids]} of one student."""
+        answer_map = {}
+        for question_id, choice_id in AssessmentAnswer.objects.filter(
+            student_id=student_id,
+            attempt=self.latest_attempt_id(student_id),
+            choice__question__assessment=self,
+        ).order_by('choice_id').values_list(
+                'choice__question_id', 'choice_id'):
+            answer_map.setdefault(question_id, []).append(choice_id)
+        return answer_map
+
     def get_right_choices(self):
         return AssessmentChoice.objects.filter(
             is_valid=True,
@@ -443,6 +710,7 @@ class Assessment(TimedModel):
         # get right answers for multiple questions
         set_multiple_choice_ids = set(AssessmentChoice.objects.filter(
             answers__student=student_id,
+            answers__attempt=self.latest_attempt_id(student_id),
             question__assessment=self,
             is_valid=True,
         ).values_list('id', flat=True))
@@ -478,6 +746,10 @@ class AssessmentQuestion(TimedModel):
     )
     enabled = models.BooleanField(default=True)
     order = models.PositiveSmallIntegerField(default=1)
+    # item parameters used by adaptive courses
+    difficulty = models.FloatField(default=0)
+    discrimination = models.FloatField(
+        default=1, validators=[MinValueValidator(0.01)])
 
     def __str__(self):
         return f'{self.title}'
@@ -486,16 +758,16 @@ class AssessmentQuestion(TimedModel):
         ordering = ['order']
         verbose_name_plural = 'Questions'
         verbose_name = 'Question'
+        indexes = [
+            models.Index(fields=['assessment', 'order']),
+        ]
 
     def save(self, *args, **kwargs):
-        if not self.id:
-            max_order = self.assessment.questions.aggregate(Max('order'))
-            max_order = max_order['order__max']
-            if max_order is not None:
-                self.order = max_order + 1
-            else:
-                self.order = 1
-        super(AssessmentQuestion, self).save(*args, **kwargs)
+        if self.id or not self.assessment_id:
+            return super(AssessmentQuestion, self).save(*args, **kwargs)
+        with transaction.atomic():
+            self.order = self.assessment.reserve_question_orders()
+            super(AssessmentQuestion, self).save(*args, **kwargs)
 
 
 class AssessmentChoice(TimedModel):
@@ -531,6 +803,43 @@ class AssessmentChoice(TimedModel):
         return self.question.assessment
 
 
+class AssessmentAttempt(TimedModel):
+    assessment = models.ForeignKey(
+        'Assessment', related_name='attempts',
+        on_delete=models.CASCADE,
+    )
+    student = models.ForeignKey(
+        'profiles.StudentProfile', related_name='assessment_attempts',
+        on_delete=models.CASCADE,
+    )
+    number = models.PositiveSmallIntegerField(default=1)
+    started_at = models.DateTimeField(default=now)
+    submitted_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'Assessment Attempts'
+        verbose_name = 'Assessment Attempt'
+        # also serves the latest attempt lookup of a student
+        unique_together = ('assessment', 'student', 'number')
+
+    def __str__(self):
+        return f'{self.assessment} #{self.number} student: {self.student}'
+
+    @property
+    def deadline(self):
+        return self.started_at + timedelta(minutes=self.assessment.duration)
+
+    def is_expired(self, at=None):
+        return (at or now()) >= self.deadline
+
+    def submit(self):
+        """Close the attempt once. Returns False if it already was."""
+        self.submitted_at = now()
+        return bool(AssessmentAttempt.objects.filter(
+            id=self.id, submitted_at__isnull=True,
+        ).update(submitted_at=self.submitted_at))
+
+
 class AssessmentAnswer(TimedModel):
     student = models.ForeignKey(
         'profiles.StudentProfile', related_name='answers',
@@ -540,6 +849,11 @@ class AssessmentAnswer(TimedModel):
         'AssessmentChoice', related_name='answers',
         on_delete=models.CASCADE,
     )
+    attempt = models.ForeignKey(
+        'AssessmentAttempt', related_name='answers',
+        on_delete=models.CASCADE,
+        null=True, blank=True,
+    )
 
     class Meta:
         verbose_name_plural = 'Assessment Answers'
@@ -584,10 +898,35 @@ class Session(TimedModel):
     )
     is_default = models.BooleanField(default=False)
     description = models.TextField(null=True)
+    capacity = models.PositiveSmallIntegerField(
+        validators=[MinValueValidator(1)],
+        null=True, blank=True,
+        help_text='Course capacity is used if empty',
+    )
+    objects = SessionQuerySet.as_manager()
 
     class Meta:
         ordering = ['end_date']
         verbose_name_plural = 'Course Lecture Sessions'
+        indexes = [
+            models.Index(fields=['start_date', 'end_date']),
+        ]
+
+    def clean(self):
+        if not self.start_date or not self.end_date:
+            raise ValidationError('Fields are required')
+        if self.start_date >= self.end_date:
+            raise ValidationError(
+                'The start date should be lower than the end date')
+        people = get_course_people(self.lecture.course)
+        overlapping = overlapping_sessions(
+            people, self.start_date, self.end_date,
+        ).exclude(id=self.id).first()
+        if overlapping:
+            raise ValidationError(
+                'Teacher or assistant already has a session '
+                'from {} to {}'.format(
+                    overlapping.start_date, overlapping.end_date))
 
     def save(self, *args, **kwargs):
         self.duration = get_duration(self.start_date, self.end_date)
@@ -595,15 +934,24 @@ class Session(TimedModel):
             self.is_default = True
         super(Session, self).save(*args, **kwargs)
 
+    def get_capacity(self):
+        return self.capacity or self.lecture.course.capacity
+
+    @property
+    def has_ended(self):
+        return self.end_date < now()
+
     @property
     def can_join(self):
         current = now()
+        if self.end_date < current:
+            return False
         # if lesson has already started, allow joining
         if self.start_date <= current:
             return True
 
         # allow joining some mins before the lesson starts
-        mins_before_join = 20
+        mins_before_join = JOIN_WINDOW_MINUTES
         time = self.start_date - current
         return time.total_seconds() / 60 <= mins_before_join
 
@@ -624,3 +972,48 @@ class StudentScore(TimedModel):
 
     class Meta:
         verbose_name_plural = 'Students Scores'
+
+
+class GradebookEntry(TimedModel):
+    """Latest score of a student for an assessment, kept per course."""
+    course = models.ForeignKey(
+        'Course', related_name='gradebook',
+        on_delete=models.CASCADE,
+    )
+    assessment = models.ForeignKey(
+        'Assessment', related_name='gradebook_entries',
+        on_delete=models.CASCADE,
+    )
+    student = models.ForeignKey(
+        'profiles.StudentProfile', related_name='gradebook_entries',
+        on_delete=models.CASCADE,
+    )
+    score = models.IntegerField()
+    attempt = models.PositiveSmallIntegerField(default=1)
+    passed = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name_plural = 'Gradebook Entries'
+        verbose_name = 'Gradebook Entry'
+        unique_together = ('assessment', 'student')
+        indexes = [
+            models.Index(fields=['course', 'student']),
+        ]
+
+    def __str__(self):
+        return f'{self.assessment} student: {self.student} {self.score}'
+
+    @classmethod
+    def record(cls, student_score):
+        assessment = student_score.assessment
+        attempt = assessment.get_latest_attempt(student_score.student_id)
+        cls.objects.update_or_create(
+            assessment=assessment,
+            student_id=student_score.student_id,
+            defaults={
+                'course_id': assessment.course_id,
+                'score': int(student_score.score),
+                'attempt': attempt.number if attempt else 1,
+                'passed': assessment.is_passed(student_score.score),
+            },
+        )
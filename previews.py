@@ -0,0 +1,107 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection
+
+from edutailors.apps.group_courses.custom_storage import S3Storage
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 320
+PREVIEW_TEXT_LENGTH = 2000
+PREVIEW_WORKERS = getattr(settings, 'GROUP_COURSES_PREVIEW_WORKERS', 2)
+
+# rendering is CPU bound and goes to worker processes, while downloading,
+# uploading and saving the result only wait on the network
+_render_executor = None
+_io_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_render_executor():
+    """
+    Worker processes are spawned, not forked: the web process runs
+    threads and holds database connections and locks that a fork
+    would copy in an unusable state.
+    """
+    global _render_executor
+    with _executor_lock:
+        if _render_executor is None:
+            _render_executor = ProcessPoolExecutor(
+                max_workers=PREVIEW_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+    return _render_executor
+
+
+def get_io_executor():
+    global _io_executor
+    with _executor_lock:
+        if _io_executor is None:
+            _io_executor = ThreadPoolExecutor(
+                max_workers=PREVIEW_WORKERS * 2)
+    return _io_executor
+
+
+def get_thumbnail_path(path):
+    return f'{path}.thumbnail.png'
+
+
+def get_preview_path(path):
+    return f'{path}.preview.txt'
+
+
+def render_preview(document):
+    """
+    Render the first page of a pdf document.
+    Returns a png thumbnail and the beginning of the page text.
+    """
+    import fitz
+
+    with fitz.open(stream=document, filetype='pdf') as pdf:
+        page = pdf[0]
+        zoom = THUMBNAIL_WIDTH / page.rect.width
+        pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+        thumbnail = pixmap.tobytes('png')
+        text = page.get_text()[:PREVIEW_TEXT_LENGTH]
+    return thumbnail, text
+
+
+def build_previews(material_id, path):
+    from edutailors.apps.group_courses.models import Material
+
+    try:
+        s3_storage = S3Storage()
+        with s3_storage.open(path) as document:
+            content = document.read()
+        thumbnail, text = get_render_executor().submit(
+            render_preview, content).result()
+
+        thumbnail_path = get_thumbnail_path(path)
+        preview_path = get_preview_path(path)
+        s3_storage.save(thumbnail_path, ContentFile(thumbnail))
+        s3_storage.save(preview_path, ContentFile(text.encode()))
+        Material.objects.filter(id=material_id).update(
+            thumbnail_path_within_bucket=thumbnail_path,
+            preview_path_within_bucket=preview_path,
+        )
+    except Exception:
+        logger.exception('Preview generation failed for material %s',
+                         material_id)
+    finally:
+        connection.close()
+
+
+def generate_previews(material):
+    """
+    Schedule thumbnail and text preview generation for a material.
+    Only pdf documents uploaded to our bucket are rendered.
+    """
+    path = material.file_path_within_bucket
+    if not path or not path.lower().endswith('.pdf'):
+        return None
+    return get_io_executor().submit(build_previews, material.id, path)
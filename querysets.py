@@ -1,18 +1,79 @@
+from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+SCHEDULE_WINDOW_DAYS = 15
+MAX_SCHEDULE_WINDOW_DAYS = 366
+# students may join a session this many minutes before it starts
+JOIN_WINDOW_MINUTES = getattr(
+    settings, 'GROUP_COURSES_JOIN_WINDOW_MINUTES', 20)
+
 
 class LectureQuerySet(models.QuerySet):
-    def upcoming(self):
+    def _attended(self, student=None, **params):
+        # all conditions go into one filter() call, so they apply
+        # to the same session row
+        if student is None:
+            params['sessions__session_student__isnull'] = False
+        else:
+            params['sessions__session_student__student'] = student
+        return self.filter(**params).distinct()
+
+    def upcoming(self, student=None, days=SCHEDULE_WINDOW_DAYS):
         from_ = timezone.now()
-        until = from_ + timezone.timedelta(days=15)
-        return self.filter(
-            sessions__session_student__session__start_date__gte=from_,
-            sessions__session_student__session__start_date__lte=until,
+        until = from_ + timezone.timedelta(days=days)
+        return self._attended(
+            student,
+            sessions__start_date__gte=from_,
+            sessions__start_date__lte=until,
+        )
+
+    def past(self, student=None):
+        from_ = timezone.now()
+        return self._attended(
+            student,
+            sessions__end_date__lte=from_,
         )
 
+
+class SessionQuerySet(models.QuerySet):
+    def for_student(self, student):
+        return self.filter(
+            session_student__student=student,
+        ).select_related('lecture__course').distinct()
+
+    def upcoming(self, days=SCHEDULE_WINDOW_DAYS):
+        from_ = timezone.now()
+        until = from_ + timezone.timedelta(days=days)
+        return self.filter(
+            start_date__gte=from_,
+            start_date__lte=until,
+        ).order_by('start_date')
+
     def past(self):
         from_ = timezone.now()
         return self.filter(
-            sessions__session_student__session__end_date__lte=from_,
-        )
+            end_date__lte=from_,
+        ).order_by('-start_date')
+
+    def joinable(self, at=None):
+        at = at or timezone.now()
+        return self.filter(
+            start_date__lte=at + timezone.timedelta(
+                minutes=JOIN_WINDOW_MINUTES),
+            end_date__gte=at,
+        ).order_by('start_date')
+
+    def next_join_date(self, at=None):
+        """
+        Earliest moment one of the sessions can be joined,
+        None if all of them are over.
+        """
+        at = at or timezone.now()
+        start_date = self.filter(end_date__gte=at).order_by(
+            'start_date').values_list('start_date', flat=True).first()
+        if start_date is None:
+            return None
+        join_date = start_date - timezone.timedelta(
+            minutes=JOIN_WINDOW_MINUTES)
+        return max(join_date, at)
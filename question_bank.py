@@ -0,0 +1,246 @@
+import csv
+import io
+import json
+from itertools import groupby, islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from edutailors.apps.group_courses.models import (
+    AssessmentChoice, AssessmentQuestion,
+)
+from edutailors.apps.group_courses.services import bulk_create_questions
+
+JSONL = 'jsonl'
+CSV = 'csv'
+FORMATS = (JSONL, CSV)
+CHUNK_SIZE = 500
+
+QUESTION_FIELDS = (
+    'title', 'description', 'enabled', 'difficulty', 'discrimination',
+)
+CHOICE_FIELDS = ('title', 'description', 'is_valid', 'enabled')
+CSV_HEADER = (
+    ['question_order']
+    + [f'question_{field}' for field in QUESTION_FIELDS]
+    + [f'choice_{field}' for field in CHOICE_FIELDS]
+)
+
+
+def iter_questions(assessment):
+    """
+    Yield every question of the assessment as a dict with its choices.
+    Questions and choices are read with two streaming queries in the
+    same order and merged on the fly.
+    """
+    questions = AssessmentQuestion.objects.filter(
+        assessment=assessment,
+    ).order_by('order', 'id').values('id', 'order', *QUESTION_FIELDS)
+    choices = AssessmentChoice.objects.filter(
+        question__assessment=assessment,
+    ).order_by('question__order', 'question_id', 'id').values(
+        'question_id', *CHOICE_FIELDS)
+    choices = groupby(
+        choices.iterator(chunk_size=CHUNK_SIZE),
+        key=lambda choice: choice['question_id'],
+    )
+    question_id, question_choices = next(choices, (None, iter(())))
+    for question in questions.iterator(chunk_size=CHUNK_SIZE):
+        question['choices'] = []
+        if question['id'] == question_id:
+            question['choices'] = [
+                {field: choice[field] for field in CHOICE_FIELDS}
+                for choice in question_choices
+            ]
+            question_id, question_choices = next(choices, (None, iter(())))
+        del question['id']
+        yield question
+
+
+def export_jsonl(assessment):
+    for question in iter_questions(assessment):
+        yield json.dumps(question) + '\n'
+
+
+def export_csv(assessment):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        value = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return value
+
+    writer.writerow(CSV_HEADER)
+    yield flush()
+    for question in iter_questions(assessment):
+        row = [question['order']] + [
+            question[field] for field in QUESTION_FIELDS]
+        for choice in question['choices'] or [{}]:
+            writer.writerow(
+                row + [choice.get(field, '') for field in CHOICE_FIELDS])
+        yield flush()
+
+
+def parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes')
+
+
+def decode_lines(lines):
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode()
+            except UnicodeDecodeError:
+                raise ValidationError(
+                    f'Line {line_number}: should be UTF-8 text')
+        yield line
+
+
+def parse_jsonl(lines):
+    """Yield (line number, question) for every non empty line."""
+    for line_number, line in enumerate(decode_lines(lines), 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            raise ValidationError(f'Line {line_number}: invalid JSON')
+
+
+def iter_rows(reader):
+    try:
+        for row in reader:
+            yield reader.line_num, row
+    except csv.Error as e:
+        raise ValidationError(f'Line {reader.line_num}: {e}')
+
+
+def parse_csv(lines):
+    """Yield (line number of its first row, question)."""
+    reader = csv.DictReader(decode_lines(lines))
+    missing = set(CSV_HEADER) - set(reader.fieldnames or ())
+    if missing:
+        raise ValidationError(
+            'Line 1: missing columns {}'.format(', '.join(sorted(missing))))
+    rows = iter_rows(reader)
+    # rows of one question are consecutive and share its order
+    for _, question_rows in groupby(
+        rows, key=lambda item: item[1]['question_order'],
+    ):
+        question_rows = list(question_rows)
+        line_number, first_row = question_rows[0]
+        question = {
+            field: first_row[f'question_{field}']
+            for field in QUESTION_FIELDS
+        }
+        question['enabled'] = parse_bool(question['enabled'])
+        question['choices'] = [
+            {
+                'title': row['choice_title'],
+                'description': row['choice_description'],
+                'is_valid': parse_bool(row['choice_is_valid']),
+                'enabled': parse_bool(row['choice_enabled']),
+            }
+            for _, row in question_rows if row['choice_title']
+        ]
+        yield line_number, question
+
+
+def validate_question(line_number, data):
+    """
+    Check a parsed question and its choices before anything is built
+    from it. Numbers are converted, errors name the line.
+    """
+    def error(message):
+        return ValidationError(f'Line {line_number}: {message}')
+
+    def has_title(item):
+        title = item.get('title')
+        return isinstance(title, str) and bool(title.strip())
+
+    if not isinstance(data, dict):
+        raise error('a question should be an object')
+    if not has_title(data):
+        raise error('title is required')
+    for field in ('difficulty', 'discrimination'):
+        if data.get(field) in (None, ''):
+            continue
+        try:
+            data[field] = float(data[field])
+        except (TypeError, ValueError):
+            raise error(f'{field} should be a number')
+    if data.get('discrimination') not in (None, '') and \
+            data['discrimination'] <= 0:
+        raise error('discrimination should be positive')
+    if 'enabled' in data and not isinstance(data['enabled'], bool):
+        data['enabled'] = parse_bool(data['enabled'])
+    choices = data.setdefault('choices', [])
+    if not isinstance(choices, list) or not all(
+        isinstance(choice, dict) and has_title(choice) for choice in choices
+    ):
+        raise error('choices should be a list of objects with a title')
+    for choice in choices:
+        for field in ('is_valid', 'enabled'):
+            if field in choice and not isinstance(choice[field], bool):
+                choice[field] = parse_bool(choice[field])
+    return data
+
+
+def build_question(data):
+    question = AssessmentQuestion(
+        title=data['title'],
+        description=data.get('description'),
+    )
+    for field in ('enabled', 'difficulty', 'discrimination'):
+        if data.get(field) not in (None, ''):
+            setattr(question, field, data[field])
+    return question
+
+
+def build_choice(question_id, data):
+    return AssessmentChoice(
+        question_id=question_id,
+        title=data['title'],
+        description=data.get('description') or '',
+        is_valid=data.get('is_valid', False),
+        enabled=data.get('enabled', True),
+    )
+
+
+def import_questions(assessment, lines, format=JSONL):
+    """
+    Append questions read from JSON Lines or CSV to the assessment.
+    Questions and choices are inserted in chunks with bulk_create,
+    all in one transaction. Returns (questions count, choices count).
+    """
+    parse = parse_csv if format == CSV else parse_jsonl
+    questions = (
+        validate_question(line_number, data)
+        for line_number, data in parse(lines)
+    )
+    questions_count = choices_count = 0
+    with transaction.atomic():
+        while True:
+            chunk = list(islice(questions, CHUNK_SIZE))
+            if not chunk:
+                break
+            created = bulk_create_questions(
+                assessment, [build_question(data) for data in chunk])
+            # bulk_create sets primary keys on PostgreSQL only, so they
+            # are read back by the orders which were just reserved
+            ids = dict(AssessmentQuestion.objects.filter(
+                assessment=assessment,
+                order__gte=created[0].order,
+                order__lte=created[-1].order,
+            ).values_list('order', 'id'))
+            choices = [
+                build_choice(ids[question.order], choice)
+                for question, data in zip(created, chunk)
+                for choice in data.get('choices', [])
+            ]
+            AssessmentChoice.objects.bulk_create(choices)
+            questions_count += len(created)
+            choices_count += len(choices)
+    return questions_count, choices_count
@@ -0,0 +1,129 @@
+import random
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Replicas are enabled with
+#
+#     DATABASE_ROUTERS = [
+#         'edutailors.apps.group_courses.routers.GroupCoursesRouter',
+#     ]
+#     GROUP_COURSES_REPLICA_DATABASES = ['replica']
+#
+# and PrimaryPinMiddleware after AuthenticationMiddleware. Locally the
+# primary and the replica can be two SQLite files, the replica being a
+# copy of the primary taken after `migrate`:
+#
+#     DATABASES = {
+#         'default': {
+#             'ENGINE': 'django.db.backends.sqlite3',
+#             'NAME': 'primary.sqlite3',
+#         },
+#         'replica': {
+#             'ENGINE': 'django.db.backends.sqlite3',
+#             'NAME': 'replica.sqlite3',
+#             'TEST': {'MIRROR': 'default'},
+#         },
+#     }
+#
+# The test runner does not create a mirror database, reads from the
+# replica alias go to the test primary instead.
+APP_LABEL = 'group_courses'
+PRIMARY_DATABASE = getattr(
+    settings, 'GROUP_COURSES_PRIMARY_DATABASE', DEFAULT_DB_ALIAS)
+REPLICA_DATABASES = getattr(settings, 'GROUP_COURSES_REPLICA_DATABASES', [])
+# replicas lag behind, a user who wrote reads from the primary for a while
+PRIMARY_PIN_SECONDS = getattr(
+    settings, 'GROUP_COURSES_PRIMARY_PIN_SECONDS', 10)
+
+_state = threading.local()
+
+
+def get_pin_key(user_id):
+    return f'group_courses:primary_pin:{user_id}'
+
+
+def is_pinned():
+    """
+    Whether reads of the current thread must go to the primary. The
+    user is looked up once per request, when the view authenticated it.
+    """
+    if getattr(_state, 'pinned', False):
+        return True
+    request = getattr(_state, 'request', None)
+    if request is None or getattr(_state, 'checked', False):
+        return False
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return False
+    _state.checked = True
+    _state.pinned = bool(cache.get(get_pin_key(user.id)))
+    return _state.pinned
+
+
+def pin_to_primary():
+    _state.pinned = True
+    _state.wrote = True
+
+
+def reset():
+    _state.__dict__.clear()
+
+
+class GroupCoursesRouter:
+    """
+    Send reads of group courses models to a random replica, and
+    everything else to the primary. Reads stay on the primary once
+    the current thread wrote or is inside a transaction.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != APP_LABEL or not REPLICA_DATABASES:
+            return None
+        if is_pinned() or connections[PRIMARY_DATABASE].in_atomic_block:
+            return PRIMARY_DATABASE
+        return random.choice(REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != APP_LABEL:
+            return None
+        pin_to_primary()
+        return PRIMARY_DATABASE
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY_DATABASE, *REPLICA_DATABASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in REPLICA_DATABASES:
+            return False
+        return None
+
+
+class PrimaryPinMiddleware:
+    """
+    Pin the reads of a user to the primary for PRIMARY_PIN_SECONDS
+    after a request of theirs wrote, so a student always sees their
+    own answers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reset()
+        _state.request = request
+        try:
+            response = self.get_response(request)
+            # token authentication sets the user inside the view
+            user = getattr(request, 'user', None)
+            if getattr(_state, 'wrote', False) and user \
+                    and user.is_authenticated:
+                cache.set(get_pin_key(user.id), True, PRIMARY_PIN_SECONDS)
+            return response
+        finally:
+            reset()
@@ -0,0 +1,342 @@
+import threading
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connections, router, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from edutailors.apps.group_courses.adaptive import invalidate_item_bank
+from edutailors.apps.group_courses.calendars import (
+    STUDENT, TEACHER, invalidate_calendars,
+)
+from edutailors.apps.group_courses.exam_papers import invalidate_exam_paper
+from edutailors.apps.group_courses.models import (
+    Assessment, AssessmentAnswer, AssessmentChoice, AssessmentQuestion,
+    Enrollment, Material, Session, SessionStudent, get_random_ids,
+)
+from edutailors.apps.group_courses.timetable import (
+    get_course_people, validate_sessions,
+)
+
+
+def move_students(session_id, student_ids=None, from_session_id=None):
+    """
+    Move students of a lecture to another session of the same lecture
+    with a single UPDATE. Students are picked by `student_ids`, by the
+    session they come from, or both.
+    The target session row stays locked until the move is committed,
+    so concurrent moves can not overfill it.
+    """
+    with transaction.atomic():
+        # only the session row is locked, not its lecture and course
+        session = Session.objects.select_for_update(
+            of=('self',),
+        ).select_related('lecture__course').get(id=session_id)
+        moving = SessionStudent.objects.filter(
+            session__lecture_id=session.lecture_id,
+        ).exclude(session=session)
+        if from_session_id is not None:
+            moving = moving.filter(session_id=from_session_id)
+        if student_ids is not None:
+            moving = moving.filter(student_id__in=student_ids)
+        moving = list(moving.values_list('id', 'student_id'))
+
+        capacity = session.get_capacity()
+        taken = session.session_student.count()
+        if taken + len(moving) > capacity:
+            raise ValidationError(
+                'Session has only {} free places, {} students '
+                'can not be moved'.format(max(capacity - taken, 0),
+                                          len(moving)))
+        moved = SessionStudent.objects.filter(
+            id__in=[id for id, _ in moving],
+        ).update(session=session)
+
+    invalidate_calendars(STUDENT, [student_id for _, student_id in moving])
+    return {
+        'moved': moved,
+        'taken': taken + moved,
+        'capacity': capacity,
+    }
+
+
+def record_diagnostic_answer(course_id, student, question):
+    """
+    Update the diagnostic progress of an enrollment for an answer
+    to `question` with a single conditional UPDATE. Must be called
+    before the answer itself is saved.
+    Returns the number of updated enrollments.
+    """
+    status = Enrollment.DiagnosticStatusType
+    answered_before = AssessmentAnswer.objects.filter(
+        student=student,
+        choice__question=question,
+    ).exists()
+    increment = 0 if answered_before else 1
+    questions_count = question.assessment.questions_count
+    if question.assessment.course.is_adaptive:
+        # adaptive tests are completed by the item selection engine
+        completed = When(
+            diagnostic_status=status.COMPLETED,
+            then=Value(status.COMPLETED),
+        )
+    else:
+        completed = When(
+            diagnostic_answered_count__gte=questions_count - increment,
+            then=Value(status.COMPLETED),
+        )
+    return Enrollment.objects.filter(
+        course_id=course_id,
+        student=student,
+    ).update(
+        diagnostic_answered_count=F('diagnostic_answered_count') + increment,
+        diagnostic_question_order=Greatest(
+            'diagnostic_question_order', Value(question.order)),
+        diagnostic_status=Case(
+            completed,
+            default=Value(status.IN_PROGRESS),
+        ),
+    )
+
+
+class AssessmentChanges:
+    """
+    Assessments changed by the current transaction. They are handled
+    once it commits, however many questions or choices were touched.
+    """
+
+    def __init__(self):
+        self.invalidated = set()
+        self.renumbered = set()
+        self.questions = set()
+
+    def flush(self):
+        invalidated = self.invalidated | self.renumbered
+        if self.questions:
+            # questions deleted meanwhile report their own assessment
+            invalidated.update(AssessmentQuestion.objects.filter(
+                id__in=self.questions, assessment__isnull=False,
+            ).values_list('assessment_id', flat=True))
+        # assessments deleted in the transaction are not found
+        for assessment in Assessment.objects.filter(id__in=self.renumbered):
+            with transaction.atomic():
+                assessment.renumber_questions()
+        for assessment_id in invalidated:
+            invalidate_item_bank(assessment_id)
+            invalidate_exam_paper(assessment_id)
+
+
+_pending = threading.local()
+
+
+def record_assessment_change(kind, value):
+    """Add an assessment or question id to the changes of `kind`."""
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        changes = AssessmentChanges()
+        getattr(changes, kind).add(value)
+        changes.flush()
+        return
+    changes = getattr(_pending, 'changes', None)
+    # a flushed or rolled back batch is no longer among the callbacks
+    if changes is None or not any(
+        func == changes.flush for _, func in connection.run_on_commit
+    ):
+        changes = _pending.changes = AssessmentChanges()
+        transaction.on_commit(changes.flush)
+    getattr(changes, kind).add(value)
+
+
+def invalidate_assessment(assessment_id):
+    """
+    Drop the cached item bank and exam paper of an assessment once the
+    transaction commits, so a request running meanwhile can not cache
+    the old questions under the new version.
+    """
+    record_assessment_change('invalidated', assessment_id)
+
+
+def renumber_assessment(assessment_id):
+    """Close the gaps left by deleted questions once committed."""
+    record_assessment_change('renumbered', assessment_id)
+
+
+def invalidate_question(question_id):
+    record_assessment_change('questions', question_id)
+
+
+def bulk_create_questions(assessment, questions):
+    """
+    Append unsaved questions to an assessment with one INSERT.
+    They get contiguous orders after the existing questions, in
+    list order.
+    """
+    with transaction.atomic():
+        first_order = assessment.reserve_question_orders(len(questions))
+        for number, question in enumerate(questions):
+            question.assessment = assessment
+            question.order = first_order + number
+        # bulk_create sends no post_save
+        invalidate_assessment(assessment.id)
+        return AssessmentQuestion.objects.bulk_create(questions)
+
+
+def move_question(question, order):
+    """
+    Move a question to `order`, shifting the questions in between
+    with a single UPDATE.
+    """
+    with transaction.atomic():
+        questions_count = question.assessment.lock()
+        current = AssessmentQuestion.objects.filter(
+            id=question.id).values_list('order', flat=True).get()
+        order = min(max(order, 1), questions_count)
+        if order == current:
+            return
+        shift = 1 if order < current else -1
+        AssessmentQuestion.objects.filter(
+            assessment_id=question.assessment_id,
+            order__gte=min(order, current),
+            order__lte=max(order, current),
+        ).update(order=Case(
+            When(id=question.id, then=Value(order)),
+            default=F('order') + shift,
+        ))
+        invalidate_assessment(question.assessment_id)
+    question.order = order
+
+
+def swap_questions(first, second):
+    """Swap the orders of two questions of one assessment."""
+    if first.assessment_id != second.assessment_id:
+        raise ValidationError('Questions belong to different assessments')
+    with transaction.atomic():
+        first.assessment.lock()
+        orders = dict(AssessmentQuestion.objects.filter(
+            id__in=[first.id, second.id]).values_list('id', 'order'))
+        AssessmentQuestion.objects.filter(
+            id__in=[first.id, second.id],
+        ).update(order=Case(
+            When(id=first.id, then=Value(orders[second.id])),
+            When(id=second.id, then=Value(orders[first.id])),
+        ))
+        invalidate_assessment(first.assessment_id)
+    first.order, second.order = orders[second.id], orders[first.id]
+
+
+def insert_objects(model, objects):
+    """
+    Insert objects and set their primary keys, with a single query
+    where the database returns ids from a bulk insert.
+    The model save() methods are not called.
+    """
+    connection = connections[router.db_for_write(model)]
+    if connection.features.can_return_ids_from_bulk_insert:
+        return model.objects.bulk_create(objects)
+    for obj in objects:
+        obj.save_base(force_insert=True)
+    return objects
+
+
+def copy_fields(obj, fields, **values):
+    params = {field: getattr(obj, field) for field in fields}
+    params.update(values)
+    return type(obj)(**params)
+
+
+def clone_course(course, start_date=None):
+    """
+    Copy a course with its lectures, sessions, materials and assessments.
+    All dates move by the distance between the old and the new start date.
+    Raises ValidationError if a copied session overlaps a session of
+    the teacher or the assistant.
+    Every level is inserted at once, so the clone takes a few queries
+    per level instead of one or more per object.
+    """
+    shift = start_date - course.start_date if start_date else timedelta()
+    with transaction.atomic():
+        clone = copy_fields(course, (
+            'level', 'title', 'subject_id', 'teacher_id', 'assistant_id',
+            'description', 'image', 'cost', 'capacity', 'enabled',
+            'is_adaptive', 'test_drive', 'material_type',
+        ), start_date=course.start_date + shift,
+            end_date=course.end_date + shift)
+        clone.save()
+
+        # lecture slugs are unique and checked against the database one
+        # by one, so lectures are not inserted in bulk
+        lectures = list(course.lectures.all())
+        new_lectures = [
+            copy_fields(lecture, (
+                'title', 'description', 'enabled',
+            ), course=clone)
+            for lecture in lectures
+        ]
+        for lecture in new_lectures:
+            lecture.save_base(force_insert=True)
+        lecture_ids = {
+            old.id: new.id for old, new in zip(lectures, new_lectures)}
+
+        sessions = list(Session.objects.filter(lecture__course=course))
+        new_sessions = [
+            copy_fields(session, (
+                'duration', 'is_default', 'description', 'capacity',
+            ), id=id, lecture_id=lecture_ids[session.lecture_id],
+                start_date=session.start_date + shift,
+                end_date=session.end_date + shift)
+            for session, id in zip(sessions, get_random_ids(len(sessions)))
+        ]
+        # the clone has the same teacher, so its sessions must not
+        # overlap the ones of the original course
+        validate_sessions(get_course_people(course), new_sessions)
+        Session.objects.bulk_create(new_sessions)
+
+        # documents are stored under unique keys and never changed,
+        # so the copies point to the same files
+        Material.objects.bulk_create([
+            copy_fields(material, (
+                'title', 'description', 'document', 'enabled',
+                'file_path_within_bucket', 'thumbnail_path_within_bucket',
+                'preview_path_within_bucket', 'gmat', 'sat', 'gre',
+            ), course=clone)
+            for material in course.materials.all()
+        ])
+
+        assessments = list(course.assessments.all())
+        new_assessments = insert_objects(Assessment, [
+            copy_fields(assessment, (
+                'title', 'description', 'duration', 'max_number_of_retries',
+                'enabled', 'is_valid', 'total_score', 'assessment_type',
+                'questions_count',
+            ), course=clone,
+                start_date=assessment.start_date + shift,
+                end_date=assessment.end_date + shift,
+                valid_until=assessment.valid_until + shift)
+            for assessment in assessments
+        ])
+        assessment_ids = {
+            old.id: new.id for old, new in zip(assessments, new_assessments)}
+
+        questions = list(AssessmentQuestion.objects.filter(
+            assessment__course=course))
+        new_questions = insert_objects(AssessmentQuestion, [
+            copy_fields(question, (
+                'title', 'description', 'enabled', 'order',
+                'difficulty', 'discrimination',
+            ), assessment_id=assessment_ids[question.assessment_id])
+            for question in questions
+        ])
+        question_ids = {
+            old.id: new.id for old, new in zip(questions, new_questions)}
+
+        AssessmentChoice.objects.bulk_create([
+            copy_fields(choice, (
+                'title', 'description', 'is_valid', 'enabled',
+            ), question_id=question_ids[choice.question_id])
+            for choice in AssessmentChoice.objects.filter(
+                question__assessment__course=course)
+        ])
+
+    invalidate_calendars(TEACHER, [clone.teacher_id, clone.assistant_id])
+    return clone
@@ -0,0 +1,117 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from edutailors.apps.group_courses.calendars import (
+    STUDENT, invalidate_calendars, invalidate_session_calendars,
+)
+from edutailors.apps.group_courses import leaderboard
+from edutailors.apps.group_courses.exam_papers import get_exam_paper
+from edutailors.apps.group_courses.models import (
+    Assessment, AssessmentChoice, AssessmentQuestion, Course, Enrollment,
+    GradebookEntry, Lecture, Material, Session, SessionStudent, StudentScore,
+)
+from edutailors.apps.group_courses.previews import generate_previews
+from edutailors.apps.group_courses.services import (
+    invalidate_assessment, invalidate_question, renumber_assessment,
+)
+
+
+@receiver(post_save, sender=Material)
+def material_created(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: generate_previews(instance))
+
+
+@receiver(post_delete, sender=Material)
+def material_deleted(sender, instance, **kwargs):
+    # also sent for queryset deletes and cascades from the course
+    if instance.subcategory:
+        Course(id=instance.course_id).update_material_type()
+
+
+@receiver(post_delete, sender=Enrollment)
+def enrollment_deleted(sender, instance, **kwargs):
+    # queryset deletes and cascades from the course or the student
+    # never call Enrollment.delete
+    instance.release()
+
+
+@receiver(post_save, sender=SessionStudent)
+@receiver(post_delete, sender=SessionStudent)
+def session_student_changed(sender, instance, **kwargs):
+    invalidate_calendars(STUDENT, [instance.student_id])
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_changed(sender, instance, **kwargs):
+    invalidate_session_calendars([instance.id])
+
+
+@receiver(post_save, sender=Lecture)
+def lecture_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_session_calendars(
+            instance.sessions.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Assessment)
+def assessment_saved(sender, instance, **kwargs):
+    invalidate_assessment(instance.id)
+    if instance.enabled:
+        # render the paper once, before students open it
+        transaction.on_commit(lambda: get_exam_paper(instance.id))
+
+
+@receiver(post_delete, sender=Assessment)
+def assessment_deleted(sender, instance, **kwargs):
+    invalidate_assessment(instance.id)
+
+
+@receiver(post_save, sender=AssessmentQuestion)
+def question_saved(sender, instance, **kwargs):
+    if instance.assessment_id:
+        invalidate_assessment(instance.assessment_id)
+
+
+@receiver(post_delete, sender=AssessmentQuestion)
+def question_deleted(sender, instance, **kwargs):
+    """
+    Renumber the remaining questions for every way of deleting one,
+    a queryset delete or a cascade included. Each assessment is
+    renumbered once, when the transaction commits.
+    """
+    if instance.assessment_id:
+        renumber_assessment(instance.assessment_id)
+
+
+@receiver(post_save, sender=AssessmentChoice)
+@receiver(post_delete, sender=AssessmentChoice)
+def choice_changed(sender, instance, **kwargs):
+    if instance.question_id:
+        invalidate_question(instance.question_id)
+
+
+@receiver(post_save, sender=StudentScore)
+def student_score_saved(sender, instance, **kwargs):
+    GradebookEntry.record(instance)
+
+
+@receiver(post_delete, sender=StudentScore)
+def student_score_deleted(sender, instance, **kwargs):
+    GradebookEntry.objects.filter(
+        assessment_id=instance.assessment_id,
+        student_id=instance.student_id,
+    ).delete()
+
+
+@receiver(post_save, sender=GradebookEntry)
+def gradebook_entry_saved(sender, instance, **kwargs):
+    leaderboard.record_score(
+        instance.assessment_id, instance.student_id, instance.score)
+
+
+@receiver(post_delete, sender=GradebookEntry)
+def gradebook_entry_deleted(sender, instance, **kwargs):
+    leaderboard.remove_score(instance.assessment_id, instance.student_id)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses import adaptive
+from edutailors.apps.group_courses.adaptive import ItemBank
+from edutailors.apps.group_courses.models import Enrollment
+
+
+class ItemBankTestCase(SimpleTestCase):
+    def setUp(self):
+        self.bank = ItemBank(
+            question_ids=[10, 20, 30],
+            difficulty=[-2, 0, 2],
+            discrimination=[1, 1, 1],
+            valid_choices=[frozenset({1}), frozenset({2}), frozenset({3})],
+        )
+
+    def test_score(self):
+        answered, correct = self.bank.score({10: {1}, 30: {3, 4}})
+        self.assertEqual(list(answered), [0, 2])
+        self.assertEqual(list(correct), [True, False])
+
+    def test_estimate_follows_answers(self):
+        answered, correct = self.bank.score({10: {1}, 20: {2}})
+        high, _ = self.bank.estimate(answered, correct)
+        answered, correct = self.bank.score({10: {5}, 20: {5}})
+        low, _ = self.bank.estimate(answered, correct)
+        self.assertGreater(high, 0)
+        self.assertLess(low, 0)
+
+    def test_select_most_informative_item(self):
+        answered, correct = self.bank.score({})
+        self.assertEqual(self.bank.select(0, answered), 20)
+        answered, correct = self.bank.score({20: {2}})
+        self.assertEqual(self.bank.select(1.8, answered), 30)
+
+    def test_select_returns_none_when_all_answered(self):
+        answered, correct = self.bank.score({10: {1}, 20: {2}, 30: {3}})
+        self.assertIsNone(self.bank.select(0, answered))
+
+
+@mock.patch.object(adaptive, 'next_question')
+class RecordAbilityTestCase(SimpleTestCase):
+    def record_ability(self):
+        with mock.patch.object(Enrollment, 'objects') as objects:
+            adaptive.record_ability(mock.Mock(), 1, 2)
+        objects.filter.assert_called_once_with(course_id=1, student_id=2)
+        return objects.filter.return_value.update.call_args[1]
+
+    def test_in_progress(self, next_question):
+        next_question.return_value = (20, 0.5, 0.6)
+        self.assertEqual(self.record_ability(), {'diagnostic_ability': 0.5})
+
+    def test_completed(self, next_question):
+        next_question.return_value = (None, 0.5, 0.2)
+        self.assertEqual(self.record_ability(), {
+            'diagnostic_ability': 0.5,
+            'diagnostic_status': Enrollment.DiagnosticStatusType.COMPLETED,
+        })
@@ -0,0 +1,43 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses.analytics import (
+    build_selection_matrix, item_statistics,
+)
+
+
+class ItemStatisticsTestCase(SimpleTestCase):
+    def setUp(self):
+        # question 1 has choices 11 (valid) and 12,
+        # question 2 has choices 21, 22 (valid) and 23 (valid)
+        self.choice_ids = np.array([12, 11, 23, 21, 22])
+        self.question_ids = np.array([1, 1, 2, 2, 2])
+        self.valid = np.array([False, True, True, False, True])
+
+    def test_selection_matrix_keeps_latest_attempt(self):
+        student_ids, selected = build_selection_matrix(
+            self.choice_ids,
+            students=np.array([5, 5, 5, 6, 6, 7, 7]),
+            attempts=np.array([1, 1, 1, 2, 3, 4, 4]),
+            choices=np.array([11, 22, 23, 12, 11, 12, 21]),
+        )
+        self.assertEqual(list(student_ids), [5, 6, 7])
+        self.assertEqual(selected.astype(int).tolist(), [
+            [0, 1, 1, 0, 1],
+            [0, 1, 0, 0, 0],
+            [1, 0, 0, 1, 0],
+        ])
+
+    def test_item_statistics(self):
+        selected = np.array([
+            [0, 1, 1, 0, 1],
+            [0, 1, 0, 0, 0],
+            [1, 0, 0, 1, 0],
+        ], dtype=bool)
+        stats = item_statistics(selected, self.valid, self.question_ids)
+        self.assertEqual(stats['students'], 3)
+        self.assertEqual(list(stats['question_ids']), [1, 2])
+        np.testing.assert_allclose(
+            stats['percent_correct'], [200 / 3, 100 / 3])
+        np.testing.assert_allclose(stats['discrimination'], [0.5, 0.5])
+        self.assertEqual(list(stats['choice_counts']), [1, 2, 1, 1, 1])
@@ -0,0 +1,64 @@
+import datetime
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses import custom_storage
+from edutailors.apps.group_courses.custom_storage import (
+    SIGNED_URL_LIFETIME, S3Storage,
+)
+
+
+def at(timestamp):
+    return datetime.datetime.fromtimestamp(
+        timestamp, tz=datetime.timezone.utc)
+
+
+class S3StorageTestCase(SimpleTestCase):
+    def setUp(self):
+        self.storage = S3Storage()
+        self.storage.cloudfront_domain = 'cdn.example.com'
+
+    def test_get_expire_date(self):
+        window = SIGNED_URL_LIFETIME * 10
+        first = self.storage.get_expire_date(at(window + 1))
+        last = self.storage.get_expire_date(
+            at(window + SIGNED_URL_LIFETIME - 1))
+        self.assertEqual(first, last)
+        self.assertEqual(
+            first,
+            datetime.datetime.utcfromtimestamp(
+                window + 2 * SIGNED_URL_LIFETIME),
+        )
+
+    @mock.patch.object(custom_storage, 'cache')
+    @mock.patch.object(custom_storage, 'get_cloudfront_signer')
+    @mock.patch.object(custom_storage, 'now')
+    def test_signed_url_is_cached_until_window_end(
+            self, now, get_signer, cache):
+        now.return_value = at(SIGNED_URL_LIFETIME * 10 + 100)
+        cache.get.return_value = None
+        signer = get_signer.return_value
+        signer.generate_presigned_url.return_value = 'signed'
+
+        self.assertEqual(self.storage.signed_url('a.pdf'), 'signed')
+        signer.generate_presigned_url.assert_called_once_with(
+            'https://cdn.example.com/a.pdf',
+            date_less_than=datetime.datetime.utcfromtimestamp(
+                SIGNED_URL_LIFETIME * 12),
+        )
+        # kept until the window ends, a full lifetime before expiry
+        cache.set.assert_called_once_with(
+            'group_courses:signed_url:a.pdf', 'signed',
+            SIGNED_URL_LIFETIME - 100,
+        )
+
+        cache.get.return_value = 'cached'
+        self.assertEqual(self.storage.signed_url('a.pdf'), 'cached')
+        signer.generate_presigned_url.assert_called_once()
+
+    @mock.patch.object(custom_storage, 'get_cloudfront_signer')
+    def test_signed_url_without_cloudfront(self, get_signer):
+        get_signer.return_value = None
+        with mock.patch.object(S3Storage, 'url', return_value='s3'):
+            self.assertEqual(self.storage.signed_url('a.pdf'), 's3')
@@ -0,0 +1,72 @@
+import json
+
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from faker import Faker
+
+from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses.exam_papers import (
+    get_exam_paper, get_version_key,
+)
+from edutailors.apps.group_courses.models import AssessmentQuestion
+from edutailors.apps.group_courses.question_bank import import_questions
+from edutailors.apps.group_courses.services import (
+    move_question, swap_questions,
+)
+from edutailors.apps.group_courses.tests.group_courses_factory import (
+    AssessmentFactory, AssessmentQuestionFactory, CourseFactory,
+)
+
+fake = Faker()
+
+
+class ExamPaperTestCase(TransactionTestCase):
+    """
+    Cached papers are dropped when the transaction commits,
+    so these tests commit their changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        teacher = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='teacher',
+        )
+        course = CourseFactory(teacher=teacher.teacher_profile)
+        self.assessment = AssessmentFactory(course=course, enabled=True)
+        self.first = AssessmentQuestionFactory(
+            assessment=self.assessment, title='First')
+        self.second = AssessmentQuestionFactory(
+            assessment=self.assessment, title='Second')
+
+    def get_titles(self):
+        paper = json.loads(get_exam_paper(self.assessment.id))
+        return [question['title'] for question in paper['questions']]
+
+    def test_question_changed(self):
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        self.second.title = 'Changed'
+        self.second.save()
+        self.assertEqual(self.get_titles(), ['First', 'Changed'])
+
+    def test_reorder(self):
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        move_question(self.second, 1)
+        self.assertEqual(self.get_titles(), ['Second', 'First'])
+        swap_questions(self.first, self.second)
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+
+    def test_import(self):
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        import_questions(self.assessment, ['{"title": "Imported"}\n'])
+        self.assertEqual(self.get_titles(), ['First', 'Second', 'Imported'])
+
+    def test_evicted_version(self):
+        self.assertEqual(self.get_titles(), ['First', 'Second'])
+        cache.delete(get_version_key(self.assessment.id))
+        AssessmentQuestion.objects.filter(id=self.second.id).update(
+            title='Changed')
+        self.assertEqual(self.get_titles(), ['First', 'Changed'])
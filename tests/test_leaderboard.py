@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses import leaderboard
+from edutailors.apps.group_courses.leaderboard import ScoreIndex
+
+
+class ScoreIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = ScoreIndex({1: 50, 2: 80, 3: 80, 4: 20})
+
+    def test_rank_and_percentile(self):
+        self.assertEqual(self.index.rank(80), 1)
+        self.assertEqual(self.index.rank(50), 3)
+        self.assertEqual(self.index.rank(20), 4)
+        self.assertEqual(self.index.percentile(80), 100)
+        self.assertEqual(self.index.percentile(50), 50)
+        self.assertEqual(self.index.percentile(20), 25)
+
+    def test_update_replaces_previous_score(self):
+        self.index.update(4, 90)
+        self.assertEqual(len(self.index), 4)
+        self.assertEqual(self.index.sorted_scores, [50, 80, 80, 90])
+        self.assertEqual(self.index.rank(80), 2)
+
+        self.index.remove(2)
+        self.assertEqual(self.index.sorted_scores, [50, 80, 90])
+        self.index.remove(2)
+        self.assertEqual(len(self.index), 3)
+
+
+@mock.patch.dict(leaderboard._indexes, clear=True)
+class GetIndexTestCase(SimpleTestCase):
+    @mock.patch.object(ScoreIndex, 'load')
+    def test_scores_recorded_while_loading(self, load):
+        def load_gradebook(assessment_id):
+            # scores arrive after the gradebook was read
+            leaderboard.record_score(assessment_id, 2, 70)
+            leaderboard.remove_score(assessment_id, 1)
+            return ScoreIndex({1: 50, 3: 20})
+
+        load.side_effect = load_gradebook
+        index = leaderboard.get_index(1)
+        self.assertEqual(index.scores, {2: 70, 3: 20})
+        self.assertIs(leaderboard.get_index(1), index)
+        load.assert_called_once_with(1)
+        self.assertEqual(leaderboard._pending, {})
@@ -0,0 +1,138 @@
+import io
+import tarfile
+import zipfile
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses import material_import
+from edutailors.apps.group_courses.models import Course, Material
+
+
+class FakeStorage:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.saved = {}
+        self.deleted = []
+
+    def save(self, path, content):
+        if self.fail_on and self.fail_on in path:
+            raise IOError('upload failed')
+        self.saved[path] = content.read()
+
+    def delete(self, path):
+        self.deleted.append(path)
+
+    def url(self, path):
+        return f'https://bucket/{path}'
+
+
+def create_zip(files):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as zip_archive:
+        zip_archive.writestr('lessons/', '')
+        for name, content in files.items():
+            zip_archive.writestr(name, content)
+    archive.seek(0)
+    return archive
+
+
+def create_tar(files):
+    archive = io.BytesIO()
+    with tarfile.open(fileobj=archive, mode='w:gz') as tar_archive:
+        for name, content in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            tar_archive.addfile(info, io.BytesIO(content))
+    archive.seek(0)
+    return archive
+
+
+FILES = {
+    'lessons/one.pdf': b'one',
+    'lessons/two.docx': b'two',
+    '__MACOSX/lessons/._one.pdf': b'',
+    '.DS_Store': b'',
+}
+
+
+class MaterialImportTestCase(SimpleTestCase):
+    def upload(self, archive, storage):
+        uploaded = material_import.upload_archive(archive, storage)
+        return {name: storage.saved[path] for name, path in uploaded}
+
+    def test_upload_zip(self):
+        self.assertEqual(self.upload(create_zip(FILES), FakeStorage()), {
+            'lessons/one.pdf': b'one',
+            'lessons/two.docx': b'two',
+        })
+
+    def test_upload_tar(self):
+        self.assertEqual(self.upload(create_tar(FILES), FakeStorage()), {
+            'lessons/one.pdf': b'one',
+            'lessons/two.docx': b'two',
+        })
+
+    def test_corrupt_archive(self):
+        storage = FakeStorage()
+        with self.assertRaises(tarfile.TarError):
+            material_import.upload_archive(
+                io.BytesIO(b'not an archive'), storage)
+        self.assertEqual(storage.saved, {})
+
+    @mock.patch.object(material_import, 'MAX_ARCHIVE_MEMBERS', 1)
+    def test_too_many_members(self):
+        storage = FakeStorage()
+        with self.assertRaises(ValidationError):
+            material_import.upload_archive(create_zip(FILES), storage)
+        self.assertEqual(storage.saved, {})
+
+    @mock.patch.object(material_import, 'MAX_ARCHIVE_SIZE', 4)
+    def test_too_large_tar(self):
+        storage = FakeStorage()
+        with self.assertRaises(ValidationError):
+            material_import.upload_archive(create_tar(FILES), storage)
+        self.assertEqual(sorted(storage.deleted), sorted(storage.saved))
+
+    def test_failed_upload_removes_uploaded_documents(self):
+        storage = FakeStorage(fail_on='two')
+        with self.assertRaises(IOError):
+            material_import.upload_archive(create_zip(FILES), storage)
+        self.assertEqual(sorted(storage.deleted), sorted(storage.saved))
+
+    @mock.patch.object(material_import, 'S3Storage')
+    def test_invalid_subcategory(self, storage_class):
+        with self.assertRaises(ValidationError):
+            material_import.import_materials(
+                Course(id=1), create_zip(FILES), gmat='unknown')
+        storage_class.assert_not_called()
+
+    @mock.patch.object(material_import, 'transaction')
+    @mock.patch.object(material_import, 'S3Storage')
+    def test_failed_insert_removes_uploaded_documents(
+            self, storage_class, _):
+        storage = storage_class.return_value = FakeStorage()
+        with mock.patch.object(Material, 'objects') as objects:
+            objects.bulk_create.side_effect = DatabaseError
+            with self.assertRaises(DatabaseError):
+                material_import.import_materials(
+                    Course(id=1, material_type=None), create_zip(FILES),
+                    gmat=Material.GMATType.verbal_reasoning,
+                )
+        self.assertEqual(len(storage.saved), 2)
+        self.assertEqual(sorted(storage.deleted), sorted(storage.saved))
+
+    @mock.patch.object(material_import, 'transaction')
+    @mock.patch.object(material_import, 'S3Storage')
+    def test_document_url_is_not_stored(self, storage_class, _):
+        storage_class.return_value = FakeStorage()
+        with mock.patch.object(Material, 'objects') as objects:
+            material_import.import_materials(
+                Course(id=1), create_zip(FILES))
+        materials = objects.bulk_create.call_args[0][0]
+        self.assertEqual([material.document for material in materials],
+                         ['', ''])
+        self.assertTrue(all(
+            material.file_path_within_bucket for material in materials))
@@ -0,0 +1,61 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.utils.timezone import now
+
+from edutailors.apps.group_courses import meeting_rooms
+from edutailors.apps.group_courses.meeting_rooms import (
+    ASSISTANT, STUDENT, TEACHER, get_join_url, get_role,
+)
+
+
+def create_user(user_id, full_name):
+    return mock.Mock(id=user_id, **{'get_full_name.return_value': full_name})
+
+
+@mock.patch.object(meeting_rooms, 'cache')
+@mock.patch.object(meeting_rooms, 'get_room')
+class MeetingRoomsTestCase(SimpleTestCase):
+    def setUp(self):
+        self.teacher = create_user(1, 'Ann Lee')
+        self.assistant = create_user(2, 'Bob Stone')
+        self.student = create_user(3, 'Cid Moss')
+        self.session = mock.Mock(
+            id='session', end_date=now() + timedelta(hours=1))
+        course = self.session.lecture.course
+        course.teacher.user_id = self.teacher.id
+        course.assistant.user_id = self.assistant.id
+
+    def test_get_role(self, *_):
+        self.assertEqual(get_role(self.session, self.teacher), TEACHER)
+        self.assertEqual(get_role(self.session, self.assistant), ASSISTANT)
+        self.assertEqual(get_role(self.session, self.student), STUDENT)
+        self.session.lecture.course.assistant = None
+        self.assertEqual(get_role(self.session, self.assistant), STUDENT)
+
+    def test_get_join_url(self, get_room, cache):
+        cache.get.return_value = None
+        room = get_room.return_value
+        room.moderator_password = 'moderator'
+        room.attendee_password = 'attendee'
+        room.join_url.side_effect = '{}|{}'.format
+
+        self.assertEqual(get_join_url(self.session, self.teacher),
+                         'Teacher: Ann Lee|moderator')
+        self.assertEqual(get_join_url(self.session, self.assistant),
+                         'Assistant: Bob Stone|moderator')
+        self.assertEqual(get_join_url(self.session, self.student),
+                         'Cid Moss|attendee')
+        keys = [call[0][0] for call in cache.set.call_args_list]
+        self.assertEqual(keys, [
+            'group_courses:join_url:session:teacher',
+            'group_courses:join_url:session:assistant',
+            'group_courses:join_url:session:3',
+        ])
+        # cached until the session ends
+        self.assertLessEqual(cache.set.call_args[0][2], 3600)
+
+        cache.get.return_value = 'cached'
+        self.assertEqual(get_join_url(self.session, self.student), 'cached')
+        self.assertEqual(room.join_url.call_count, 3)
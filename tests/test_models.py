@@ -1,12 +1,22 @@
-from django.test import TestCase
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
 from faker import Faker
 
 from edutailors.apps.group_courses.models import (
     Course, Lecture, Enrollment,
     Material, Assessment, Rating, AssessmentQuestion,
-    AssessmentChoice, AssessmentAnswer,
+    AssessmentChoice, AssessmentAnswer, AssessmentAttempt, SessionStudent,
+    StudentScore,
 )
 from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses import gradebook
+from edutailors.apps.group_courses.exam_papers import get_student_exam_paper
+from edutailors.apps.group_courses.services import move_question
 from edutailors.apps.education_lists.models import Subject
 from edutailors.apps.group_courses.tests.group_courses_factory import (
     CourseFactory, SubjectFactory, LectureFactory, MaterialFactory,
@@ -111,6 +121,54 @@ class EnrollmentTestCase(TestCase):
         self.assertTrue(self.enrollment)
         self.assertEqual(self.enrollment.__class__, Enrollment)
 
+    def create_waitlisted(self):
+        Course.objects.filter(id=self.course.id).update(capacity=1)
+        self.course.refresh_from_db()
+        student = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            registered_as='student',
+            raw_password='top secret',
+        )
+        waitlisted = Enrollment.objects.create(
+            student=student.student_profile, course=self.course,
+        )
+        self.assertEqual(waitlisted.status, Enrollment.StatusType.WAITLISTED)
+        return waitlisted
+
+    def assert_promoted(self, waitlisted):
+        waitlisted.refresh_from_db()
+        self.course.refresh_from_db()
+        self.assertEqual(waitlisted.status, Enrollment.StatusType.ENROLLED)
+        self.assertEqual(self.course.seats_taken, 1)
+
+    def test_waitlist_when_course_is_full(self):
+        waitlisted = self.create_waitlisted()
+        self.enrollment.delete()
+        self.assert_promoted(waitlisted)
+
+    def test_queryset_delete_promotes_waitlisted(self):
+        waitlisted = self.create_waitlisted()
+        Enrollment.objects.filter(id=self.enrollment.id).delete()
+        self.assert_promoted(waitlisted)
+
+    def test_student_delete_promotes_waitlisted(self):
+        waitlisted = self.create_waitlisted()
+        self.user.student_profile.delete()
+        self.assert_promoted(waitlisted)
+        self.assertFalse(SessionStudent.objects.filter(
+            student_id=self.enrollment.student_id).exists())
+
+    def test_raising_capacity_promotes_waitlisted(self):
+        waitlisted = self.create_waitlisted()
+        self.course.capacity = 2
+        self.course.save()
+        waitlisted.refresh_from_db()
+        self.course.refresh_from_db()
+        self.assertEqual(waitlisted.status, Enrollment.StatusType.ENROLLED)
+        self.assertEqual(self.course.seats_taken, 2)
+
 
 class MaterialTestCase(TestCase):
     def setUp(self):
@@ -134,6 +192,18 @@ class MaterialTestCase(TestCase):
         self.assertTrue(self.material)
         self.assertEqual(self.material.__class__, Material)
 
+    def test_course_material_type(self):
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.material_type, 'gmat')
+        self.material.delete()
+        self.course.refresh_from_db()
+        self.assertIsNone(self.course.material_type)
+
+    def test_course_material_type_queryset_delete(self):
+        self.course.materials.all().delete()
+        self.course.refresh_from_db()
+        self.assertIsNone(self.course.material_type)
+
 
 class AssessmentTestCase(TestCase):
     def setUp(self):
@@ -239,10 +309,13 @@ class AssessmentQuestionTestCase(TestCase):
         self.choice2_2.is_valid = False
         self.choice2_2.save()
 
+        attempt = self.assessment.start_attempt(self.user.student_profile.id)
         self.answer1 = AssessmentAnswer.objects.create(
-            student=self.user.student_profile, choice=self.choice1_1)
+            student=self.user.student_profile, choice=self.choice1_1,
+            attempt=attempt)
         self.answer2 = AssessmentAnswer.objects.create(
-            student=self.user.student_profile, choice=self.choice2_2)
+            student=self.user.student_profile, choice=self.choice2_2,
+            attempt=attempt)
 
     def test_string_representation_returns_title(self):
         self.assertEqual(
@@ -258,6 +331,80 @@ class AssessmentQuestionTestCase(TestCase):
         self.assertEqual(self.question.order, 1)
         self.assertEqual(self.question2.order, 2)
 
+    def test_reorder_questions(self):
+        question3 = AssessmentQuestionFactory(assessment=self.assessment)
+        move_question(question3, 1)
+        orders = list(self.assessment.questions.values_list('id', flat=True))
+        self.assertEqual(
+            orders, [question3.id, self.question.id, self.question2.id])
+
+    def test_attempts(self):
+        student_id = self.user.student_profile.id
+        attempt = self.assessment.get_latest_attempt(student_id)
+        self.assertEqual(attempt.number, 1)
+        self.assertEqual(attempt.answers.count(), 2)
+        self.assertEqual(self.assessment.start_attempt(student_id), attempt)
+
+        self.assertTrue(attempt.submit())
+        self.assertFalse(attempt.submit())
+        self.assessment.max_number_of_retries = 0
+        with self.assertRaises(ValidationError):
+            self.assessment.start_attempt(student_id)
+
+        self.assessment.max_number_of_retries = 1
+        attempt = self.assessment.start_attempt(student_id)
+        self.assertEqual(attempt.number, 2)
+        self.assertEqual(self.assessment.get_answer_map(student_id), {})
+
+    def test_expired_attempt_is_submitted(self):
+        student_id = self.user.student_profile.id
+        attempt = self.assessment.get_latest_attempt(student_id)
+        AssessmentAttempt.objects.filter(id=attempt.id).update(
+            started_at=now() - timedelta(minutes=self.assessment.duration))
+
+        self.assessment.max_number_of_retries = 1
+        next_attempt = self.assessment.start_attempt(student_id)
+        self.assertEqual(next_attempt.number, 2)
+        attempt.refresh_from_db()
+        self.assertIsNotNone(attempt.submitted_at)
+
+    def test_gradebook(self):
+        student_id = self.user.student_profile.id
+        score = StudentScore.objects.create(
+            assessment=self.assessment, student_id=student_id,
+            score=self.assessment.total_score)
+        students = list(gradebook.iter_students(self.course))
+        self.assertEqual(len(students), 1)
+        self.assertEqual(students[0]['grades'], {
+            self.assessment.id: {
+                'score': self.assessment.total_score,
+                'attempt': 1,
+                'passed': True,
+            },
+        })
+
+        score.delete()
+        self.assertEqual(list(gradebook.iter_students(self.course)), [])
+
+    def test_get_answer_map(self):
+        self.assertEqual(
+            self.assessment.get_answer_map(self.user.student_profile.id),
+            {self.question.id: sorted([self.choice1_1.id, self.choice2_2.id])},
+        )
+
+    def test_student_exam_paper(self):
+        student_id = self.user.student_profile.id
+        data = json.loads(
+            get_student_exam_paper(self.assessment.id, student_id))
+        choices = data['paper']['questions'][0]['choices']
+        self.assertEqual(len(choices), 4)
+        self.assertNotIn('is_valid', choices[0])
+        self.assertNotIn('answers', choices[0])
+        self.assertEqual(
+            sorted(data['selected_choices'][str(self.question.id)]),
+            sorted([self.choice1_1.id, self.choice2_2.id]),
+        )
+
     def test_get_student_result(self):
         result = self.assessment.get_student_result(
             self.user.student_profile.id)
@@ -265,6 +412,64 @@ class AssessmentQuestionTestCase(TestCase):
         self.assertEqual(result, 1)
 
 
+class QuestionDeleteTestCase(TransactionTestCase):
+    """
+    Questions are renumbered when the transaction commits,
+    so these tests commit their deletes.
+    """
+
+    def setUp(self):
+        teacher = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='teacher',
+        )
+        course = CourseFactory(teacher=teacher.teacher_profile)
+        self.assessment = AssessmentFactory(course=course)
+        self.questions = [
+            AssessmentQuestionFactory(assessment=self.assessment)
+            for _ in range(4)
+        ]
+        for question in self.questions:
+            AssessmentChoiceFactory(question=question)
+
+    def get_orders(self):
+        self.assessment.refresh_from_db()
+        self.assertEqual(
+            self.assessment.questions_count, self.assessment.questions.count())
+        return list(self.assessment.questions.values_list('id', 'order'))
+
+    def test_delete_question(self):
+        first, second, third, fourth = self.questions
+        second.delete()
+        self.assertEqual(
+            self.get_orders(), [(first.id, 1), (third.id, 2), (fourth.id, 3)])
+
+    def test_delete_questions_through_queryset(self):
+        first, second, third, fourth = self.questions
+        with mock.patch.object(
+            Assessment, 'renumber_questions', autospec=True,
+            side_effect=Assessment.renumber_questions,
+        ) as renumber_questions:
+            AssessmentQuestion.objects.filter(
+                id__in=[first.id, third.id]).delete()
+        # once for the whole delete
+        renumber_questions.assert_called_once()
+        self.assertEqual(self.get_orders(), [(second.id, 1), (fourth.id, 2)])
+        question = AssessmentQuestionFactory(assessment=self.assessment)
+        self.assertEqual(question.order, 3)
+
+    def test_delete_assessment(self):
+        with mock.patch.object(
+            Assessment, 'renumber_questions', autospec=True,
+        ) as renumber_questions:
+            self.assessment.delete()
+        renumber_questions.assert_not_called()
+        self.assertFalse(AssessmentQuestion.objects.exists())
+
+
 class AssessmentChoiceTestCase(TestCase):
     def setUp(self):
         self.teacher = create_user(
@@ -311,7 +516,9 @@ class AssessmentAnswerTestCase(TestCase):
         self.question = AssessmentQuestionFactory(assessment=self.assessment)
         self.choice = AssessmentChoiceFactory(question=self.question)
         self.answer = AssessmentAnswer.objects.create(
-            student=self.user.student_profile, choice=self.choice)
+            student=self.user.student_profile, choice=self.choice,
+            attempt=self.assessment.start_attempt(
+                self.user.student_profile.id))
 
     def test_string_representation_returns_name(self):
         self.assertEqual(
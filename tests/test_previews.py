@@ -0,0 +1,65 @@
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses import previews
+from edutailors.apps.group_courses.models import Material
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+
+def create_pdf(text):
+    pdf = fitz.open()
+    page = pdf.new_page(width=640, height=480)
+    page.insert_text((72, 72), text)
+    content = pdf.tobytes()
+    pdf.close()
+    return content
+
+
+class PreviewsTestCase(SimpleTestCase):
+    @skipUnless(fitz, 'PyMuPDF is not installed')
+    def test_render_preview(self):
+        thumbnail, text = previews.render_preview(create_pdf('Chapter one'))
+        self.assertTrue(thumbnail.startswith(b'\x89PNG'))
+        self.assertIn('Chapter one', text)
+
+    @mock.patch.object(previews, 'get_io_executor')
+    def test_generate_previews_only_for_pdf(self, get_io_executor):
+        material = Material(id=1, file_path_within_bucket='docs/a.docx')
+        self.assertIsNone(previews.generate_previews(material))
+        material.file_path_within_bucket = None
+        self.assertIsNone(previews.generate_previews(material))
+        get_io_executor.assert_not_called()
+
+        material.file_path_within_bucket = 'docs/a.PDF'
+        previews.generate_previews(material)
+        get_io_executor.return_value.submit.assert_called_once_with(
+            previews.build_previews, 1, 'docs/a.PDF')
+
+    @mock.patch.object(previews, 'connection')
+    @mock.patch.object(previews, 'get_render_executor')
+    @mock.patch.object(previews, 'S3Storage')
+    def test_build_previews(self, storage_class, get_render_executor, _):
+        storage = storage_class.return_value
+        storage.open.return_value.__enter__.return_value.read.return_value = \
+            b'pdf'
+        get_render_executor.return_value.submit.return_value.result \
+            .return_value = (b'png', 'text')
+
+        with mock.patch.object(Material, 'objects') as objects:
+            previews.build_previews(1, 'docs/a.pdf')
+
+        get_render_executor.return_value.submit.assert_called_once_with(
+            previews.render_preview, b'pdf')
+        saved = [call[0][0] for call in storage.save.call_args_list]
+        self.assertEqual(
+            saved, ['docs/a.pdf.thumbnail.png', 'docs/a.pdf.preview.txt'])
+        objects.filter.assert_called_once_with(id=1)
+        objects.filter.return_value.update.assert_called_once_with(
+            thumbnail_path_within_bucket='docs/a.pdf.thumbnail.png',
+            preview_path_within_bucket='docs/a.pdf.preview.txt',
+        )
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils.timezone import now
+from faker import Faker
+
+from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses.models import (
+    Lecture, Session, SessionStudent,
+)
+from edutailors.apps.group_courses.querysets import JOIN_WINDOW_MINUTES
+from edutailors.apps.group_courses.tests.group_courses_factory import (
+    CourseFactory, LectureFactory, SessionFactory,
+)
+
+fake = Faker()
+
+
+class ScheduleQuerySetTestCase(TestCase):
+    def setUp(self):
+        self.teacher = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='teacher',
+        )
+        self.user = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            registered_as='student',
+            raw_password='top secret',
+        )
+        self.student = self.user.student_profile
+        self.course = CourseFactory(teacher=self.teacher.teacher_profile)
+        self.past = self.create_session(timedelta(days=-3))
+        self.upcoming = self.create_session(timedelta(days=2))
+        self.far = self.create_session(timedelta(days=30))
+
+    def create_session(self, shift):
+        lecture = LectureFactory(course=self.course)
+        start_date = now() + shift
+        session = SessionFactory(
+            lecture=lecture,
+            start_date=start_date,
+            end_date=start_date + timedelta(hours=1),
+        )
+        SessionStudent.objects.create(session=session, student=self.student)
+        return session
+
+    def test_session_schedule(self):
+        sessions = Session.objects.for_student(self.student)
+        self.assertEqual(list(sessions.upcoming()), [self.upcoming])
+        self.assertEqual(
+            list(sessions.upcoming(days=31)), [self.upcoming, self.far])
+        self.assertEqual(list(sessions.past()), [self.past])
+
+    def test_lecture_schedule(self):
+        self.assertEqual(
+            list(Lecture.objects.upcoming(student=self.student)),
+            [self.upcoming.lecture],
+        )
+        self.assertEqual(
+            list(Lecture.objects.past(student=self.student)),
+            [self.past.lecture],
+        )
+        self.assertEqual(
+            set(Lecture.objects.upcoming(days=31)),
+            {self.upcoming.lecture, self.far.lecture},
+        )
+
+    def test_joinable(self):
+        sessions = Session.objects.for_student(self.student)
+        at = now()
+        self.assertFalse(sessions.joinable(at))
+        self.assertEqual(
+            sessions.next_join_date(at),
+            self.upcoming.start_date - timedelta(minutes=JOIN_WINDOW_MINUTES),
+        )
+
+        soon = self.create_session(timedelta(minutes=JOIN_WINDOW_MINUTES / 2))
+        self.assertEqual(list(sessions.joinable()), [soon])
+        self.assertEqual(
+            Session.objects.filter(id=self.past.id).next_join_date(), None)
+
+    def test_other_student_has_no_schedule(self):
+        other = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            registered_as='student',
+            raw_password='top secret',
+        ).student_profile
+        self.assertFalse(Session.objects.for_student(other).upcoming())
+        self.assertFalse(Lecture.objects.past(student=other))
@@ -0,0 +1,113 @@
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from faker import Faker
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses import question_bank
+from edutailors.apps.group_courses.api.views import (
+    AssessmentQuestionBankExportView, AssessmentQuestionBankImportView,
+)
+from edutailors.apps.group_courses.tests.group_courses_factory import (
+    AssessmentChoiceFactory, AssessmentFactory, AssessmentQuestionFactory,
+    CourseFactory,
+)
+
+fake = Faker()
+
+
+class QuestionBankTestCase(TestCase):
+    def setUp(self):
+        self.teacher = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='teacher',
+        )
+        self.course = CourseFactory(teacher=self.teacher.teacher_profile)
+        self.assessment = AssessmentFactory(course=self.course)
+        question = AssessmentQuestionFactory(
+            assessment=self.assessment, difficulty=1.5)
+        AssessmentChoiceFactory(question=question, is_valid=True)
+        AssessmentChoiceFactory(question=question, is_valid=False)
+        AssessmentQuestionFactory(assessment=self.assessment)
+        self.target = AssessmentFactory(course=self.course)
+
+    def round_trip(self, rows, file_format):
+        lines = io.StringIO(''.join(rows))
+        self.assertEqual(
+            question_bank.import_questions(self.target, lines, file_format),
+            (2, 2),
+        )
+        self.assertEqual(
+            list(question_bank.iter_questions(self.target)),
+            list(question_bank.iter_questions(self.assessment)),
+        )
+
+    def test_jsonl_round_trip(self):
+        self.round_trip(
+            question_bank.export_jsonl(self.assessment), question_bank.JSONL)
+
+    def test_csv_round_trip(self):
+        self.round_trip(
+            question_bank.export_csv(self.assessment), question_bank.CSV)
+
+    def test_malformed_jsonl(self):
+        for line in (
+            '["title"]',
+            '"title"',
+            '{"description": "no title"}',
+            '{"title": "q", "choices": "a"}',
+            '{"title": "q", "choices": [{"is_valid": true}]}',
+            '{"title": "q", "difficulty": "hard"}',
+            '{"title": "q",',
+        ):
+            lines = ['{"title": "first"}\n', line + '\n']
+            with self.assertRaises(ValidationError) as raised:
+                question_bank.import_questions(self.target, lines)
+            self.assertTrue(
+                raised.exception.messages[0].startswith('Line 2:'), line)
+        self.assertFalse(self.target.questions.exists())
+
+    def test_malformed_csv(self):
+        with self.assertRaises(ValidationError):
+            question_bank.import_questions(
+                self.target, ['title,choices\n', 'q,a\n'], question_bank.CSV)
+        self.assertFalse(self.target.questions.exists())
+
+    def import_file(self, user, content):
+        request = APIRequestFactory().post('/', {
+            'file': SimpleUploadedFile('bank.jsonl', content),
+            'format': question_bank.JSONL,
+        })
+        force_authenticate(request, user=user)
+        return AssessmentQuestionBankImportView.as_view()(
+            request, pk=self.target.id)
+
+    def test_import_view_rejects_malformed_file(self):
+        response = self.import_file(self.teacher, b'[1, 2]\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['message'], [
+            'Line 1: a question should be an object'])
+
+    def test_views_are_for_course_teachers(self):
+        student = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='student',
+        )
+        response = self.import_file(student, b'{"title": "q"}\n')
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(self.target.questions.exists())
+
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=student)
+        response = AssessmentQuestionBankExportView.as_view()(
+            request, pk=self.assessment.id)
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,56 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import RequestFactory, SimpleTestCase
+
+from edutailors.apps.group_courses import routers
+from edutailors.apps.group_courses.models import Assessment
+
+
+@mock.patch.object(routers, 'REPLICA_DATABASES', ['replica'])
+class GroupCoursesRouterTestCase(SimpleTestCase):
+    def setUp(self):
+        self.router = routers.GroupCoursesRouter()
+        routers.reset()
+        self.addCleanup(routers.reset)
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.router.db_for_read(Assessment), 'replica')
+        self.assertIsNone(self.router.db_for_read(User))
+
+    def test_reads_after_write_go_to_primary(self):
+        self.assertEqual(self.router.db_for_write(Assessment), 'default')
+        self.assertEqual(self.router.db_for_read(Assessment), 'default')
+
+    def test_no_migrations_on_replica(self):
+        self.assertFalse(
+            self.router.allow_migrate('replica', 'group_courses'))
+        self.assertIsNone(
+            self.router.allow_migrate('default', 'group_courses'))
+
+    @mock.patch.object(routers, 'cache')
+    def test_middleware_pins_user_after_write(self, cache):
+        user = User(id=1)
+        request = RequestFactory().post('/')
+        request.user = user
+
+        def view(request):
+            self.router.db_for_write(Assessment)
+            return 'response'
+
+        routers.PrimaryPinMiddleware(view)(request)
+        cache.set.assert_called_once_with(
+            routers.get_pin_key(1), True, routers.PRIMARY_PIN_SECONDS)
+
+        cache.get.return_value = True
+
+        def view(request):
+            return self.router.db_for_read(Assessment)
+
+        request = RequestFactory().get('/')
+        request.user = user
+        self.assertEqual(
+            routers.PrimaryPinMiddleware(view)(request), 'default')
+        request.user = AnonymousUser()
+        self.assertEqual(
+            routers.PrimaryPinMiddleware(view)(request), 'replica')
@@ -0,0 +1,82 @@
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from faker import Faker
+
+from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses.models import (
+    AssessmentChoice, AssessmentQuestion, Course, Session,
+)
+from edutailors.apps.group_courses.services import clone_course
+from edutailors.apps.group_courses.tests.group_courses_factory import (
+    AssessmentChoiceFactory, AssessmentFactory, AssessmentQuestionFactory,
+    CourseFactory, LectureFactory, MaterialFactory, SessionFactory,
+)
+
+fake = Faker()
+
+
+class CloneCourseTestCase(TestCase):
+    def setUp(self):
+        teacher = create_user(
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            email=fake.email(),
+            raw_password='top secret',
+            registered_as='teacher',
+        )
+        self.course = CourseFactory(teacher=teacher.teacher_profile)
+        self.lecture = LectureFactory(course=self.course)
+        self.session = SessionFactory(
+            lecture=self.lecture,
+            start_date=self.course.start_date,
+            end_date=self.course.start_date + timedelta(hours=1),
+        )
+        MaterialFactory(course=self.course)
+        self.assessment = AssessmentFactory(course=self.course)
+        self.question = AssessmentQuestionFactory(assessment=self.assessment)
+        AssessmentChoiceFactory(question=self.question, is_valid=True)
+
+    def test_clone_course(self):
+        shift = timedelta(days=7)
+        clone = clone_course(self.course, self.course.start_date + shift)
+        clone = Course.objects.get(id=clone.id)
+        self.assertNotEqual(clone.id, self.course.id)
+        self.assertEqual(clone.start_date, self.course.start_date + shift)
+        self.assertEqual(clone.end_date, self.course.end_date + shift)
+        self.assertEqual(clone.materials.count(), 1)
+
+        lecture = clone.lectures.get()
+        self.assertEqual(lecture.title, self.lecture.title)
+        session = Session.objects.get(lecture=lecture)
+        self.assertNotEqual(session.id, self.session.id)
+        self.assertEqual(session.start_date, self.session.start_date + shift)
+        self.assertEqual(session.end_date, self.session.end_date + shift)
+
+        assessment = clone.assessments.get()
+        self.assertEqual(
+            assessment.start_date, self.assessment.start_date + shift)
+        question = AssessmentQuestion.objects.get(assessment=assessment)
+        self.assertEqual(question.order, self.question.order)
+        choice = AssessmentChoice.objects.get(question=question)
+        self.assertTrue(choice.is_valid)
+
+        # the original course keeps its objects
+        self.assertEqual(
+            Session.objects.filter(lecture__course=self.course).get(),
+            self.session,
+        )
+        self.assertEqual(
+            AssessmentChoice.objects.filter(question=self.question).count(),
+            1,
+        )
+
+    def test_clone_must_not_double_book_the_teacher(self):
+        with self.assertRaises(ValidationError):
+            clone_course(self.course)
+        with self.assertRaises(ValidationError):
+            clone_course(self.course, self.course.start_date + timedelta(
+                minutes=30))
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(Session.objects.count(), 1)
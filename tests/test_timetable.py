@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from django.test import SimpleTestCase
+
+from edutailors.apps.group_courses.timetable import IntervalIndex, Timetable
+
+
+def at(hour):
+    return datetime(2020, 1, 1) + timedelta(hours=hour)
+
+
+class IntervalIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = IntervalIndex()
+        self.index.add(at(10), at(11), 'b')
+        self.index.add(at(8), at(12), 'a')
+        self.index.add(at(14), at(15), 'c')
+
+    def test_overlaps(self):
+        self.assertTrue(self.index.overlaps(at(11), at(13)))
+        self.assertTrue(self.index.overlaps(at(14), at(14.5)))
+        self.assertFalse(self.index.overlaps(at(12), at(14)))
+        self.assertFalse(self.index.overlaps(at(15), at(16)))
+        self.assertFalse(self.index.overlaps(at(6), at(8)))
+
+    def test_conflicts(self):
+        self.assertEqual(
+            sorted(self.index.conflicts(at(10.5), at(14.5))),
+            ['a', 'b', 'c'],
+        )
+        self.assertEqual(self.index.conflicts(at(11), at(13)), ['a'])
+
+
+class TimetableTestCase(SimpleTestCase):
+    def test_conflicts_per_person(self):
+        timetable = Timetable()
+        timetable.add((1, 2), at(10), at(11), 'session')
+        self.assertEqual(
+            timetable.conflicts((2, 3), at(10), at(12)),
+            {2: ['session']},
+        )
+        self.assertFalse(timetable.overlaps((3,), at(10), at(12)))
@@ -0,0 +1,393 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils.timezone import now
+from faker import Faker
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from edutailors.apps.accounts.services import create_user
+from edutailors.apps.group_courses.api import views
+from edutailors.apps.group_courses.api.views import (
+    AssessmentAnalyticsView, AssessmentAnswerMapView, CalendarFeedTokenView,
+    CalendarFeedView, CourseCloneView, CourseGradebookView,
+    DiagnosticTestAnswerCreateAPIView, ExamPaperView,
+    LectureRecurringSessionsCreateView, NextDiagnosticQuestionView,
+    SessionJoinUrlView, StudentJoinableSessionsView, TokenCalendarFeedView,
+)
+from edutailors.apps.group_courses.models import (
+    Assessment, AssessmentAnswer, Course, Enrollment, Session, SessionStudent,
+)
+from edutailors.apps.group_courses.calendars import STUDENT, TEACHER
+from edutailors.apps.group_courses.timetable import MAX_RECURRING_SESSIONS
+from edutailors.apps.group_courses.tests.group_courses_factory import (
+    AssessmentChoiceFactory, AssessmentFactory, AssessmentQuestionFactory,
+    CourseFactory, LectureFactory, SessionFactory,
+)
+
+fake = Faker()
+
+
+def create_person(registered_as):
+    return create_user(
+        first_name=fake.first_name(),
+        last_name=fake.last_name(),
+        email=fake.email(),
+        raw_password='top secret',
+        registered_as=registered_as,
+    )
+
+
+class ViewTestCase(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.teacher = create_person('teacher')
+        self.user = create_person('student')
+        self.course = CourseFactory(teacher=self.teacher.teacher_profile)
+        self.lecture = LectureFactory(course=self.course)
+
+    def request(self, view, user, method='get', data=None, **kwargs):
+        request = getattr(self.factory, method)('/', data, format='json')
+        force_authenticate(request, user=user)
+        return view.as_view()(request, **kwargs)
+
+
+class StudentJoinableSessionsViewTestCase(ViewTestCase):
+    def test_waits_for_next_session(self):
+        start_date = now() + timedelta(hours=2)
+        session = SessionFactory(
+            lecture=self.lecture,
+            start_date=start_date,
+            end_date=start_date + timedelta(hours=1),
+        )
+        SessionStudent.objects.create(
+            session=session, student=self.user.student_profile)
+
+        response = self.request(StudentJoinableSessionsView, self.user)
+        self.assertEqual(response.data['sessions'], [])
+        self.assertIsNotNone(response.data['next_join_date'])
+        self.assertGreater(int(response['Retry-After']), 0)
+
+        session.start_date = now()
+        session.save()
+        response = self.request(StudentJoinableSessionsView, self.user)
+        self.assertEqual(len(response.data['sessions']), 1)
+        self.assertFalse(response.has_header('Retry-After'))
+
+
+class LectureRecurringSessionsCreateViewTestCase(ViewTestCase):
+    def create_sessions(self, **data):
+        data.setdefault('start_date', '2030-01-07T10:00:00')
+        data.setdefault('end_date', '2030-01-07T11:00:00')
+        return self.request(
+            LectureRecurringSessionsCreateView, self.teacher,
+            method='post', data=data, pk=self.lecture.id,
+        )
+
+    def test_create_sessions(self):
+        response = self.create_sessions(count=3, interval_days=7)
+        self.assertEqual(response.status_code, 201)
+        sessions = Session.objects.filter(
+            lecture=self.lecture).order_by('start_date')
+        self.assertEqual(len(sessions), 3)
+        self.assertEqual(
+            sessions[2].start_date - sessions[0].start_date,
+            timedelta(days=14),
+        )
+
+    def test_invalid_input(self):
+        for data in (
+            {'count': 'many'},
+            {'count': 0},
+            {'count': MAX_RECURRING_SESSIONS + 1},
+            {'interval_days': 'weekly'},
+            {'start_date': 'tomorrow'},
+            {'end_date': '2030-01-07T09:00:00'},
+        ):
+            response = self.create_sessions(**data)
+            self.assertEqual(response.status_code, 422, data)
+        self.assertFalse(Session.objects.filter(lecture=self.lecture))
+
+
+@mock.patch.object(views, 'get_join_url', return_value='https://meet/room')
+class SessionJoinUrlViewTestCase(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        start_date = now()
+        self.session = SessionFactory(
+            lecture=self.lecture,
+            start_date=start_date,
+            end_date=start_date + timedelta(hours=1),
+        )
+        SessionStudent.objects.create(
+            session=self.session, student=self.user.student_profile)
+
+    def join(self, user):
+        return self.request(SessionJoinUrlView, user, pk=self.session.id)
+
+    def test_teacher_and_student_join(self, get_join_url):
+        for user in (self.teacher, self.user):
+            response = self.join(user)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['url'], 'https://meet/room')
+            get_join_url.assert_called_with(self.session, user)
+
+    def test_outsider_is_rejected(self, get_join_url):
+        response = self.join(create_person('student'))
+        self.assertEqual(response.status_code, 403)
+        get_join_url.assert_not_called()
+
+    def test_join_window(self, get_join_url):
+        self.session.start_date = now() + timedelta(days=1)
+        self.session.end_date = self.session.start_date + timedelta(hours=1)
+        self.session.save()
+        self.assertEqual(self.join(self.user).status_code, 409)
+
+        self.session.start_date = now() - timedelta(hours=2)
+        self.session.end_date = now() - timedelta(hours=1)
+        self.session.save()
+        self.assertEqual(self.join(self.teacher).status_code, 409)
+        self.assertEqual(self.join(self.user).status_code, 409)
+        get_join_url.assert_not_called()
+
+
+class NextDiagnosticQuestionViewTestCase(ViewTestCase):
+    @mock.patch.object(views.adaptive, 'next_question')
+    def test_adaptive_question_is_read_only(self, next_question):
+        next_question.return_value = (None, 1.5, 0.2)
+        self.course.is_adaptive = True
+        self.course.save()
+        AssessmentFactory(
+            course=self.course,
+            assessment_type=Assessment.DIAGNOSTIC,
+            is_valid=True,
+        )
+        enrollment = Enrollment.objects.create(
+            course=self.course, student=self.user.student_profile)
+
+        response = self.request(
+            NextDiagnosticQuestionView, self.user, course_id=self.course.id)
+        self.assertIsNone(response.data['question'])
+        self.assertEqual(response.data['ability'], 1.5)
+        updated = Enrollment.objects.get(id=enrollment.id)
+        self.assertIsNone(updated.diagnostic_ability)
+        self.assertEqual(
+            updated.diagnostic_status, enrollment.diagnostic_status)
+
+    def test_skipped_question_is_served(self):
+        assessment = AssessmentFactory(
+            course=self.course,
+            assessment_type=Assessment.DIAGNOSTIC,
+            is_valid=True,
+        )
+        first, second, _ = [
+            AssessmentQuestionFactory(assessment=assessment)
+            for _ in range(3)
+        ]
+        Enrollment.objects.create(
+            course=self.course, student=self.user.student_profile)
+        AssessmentAnswer.objects.create(
+            student=self.user.student_profile,
+            choice=AssessmentChoiceFactory(question=second),
+            attempt=assessment.start_attempt(self.user.student_profile.id),
+        )
+
+        response = self.request(
+            NextDiagnosticQuestionView, self.user, course_id=self.course.id)
+        self.assertEqual(response.data['question']['id'], first.id)
+
+class CourseCloneViewTestCase(ViewTestCase):
+    def clone(self, **data):
+        return self.request(
+            CourseCloneView, self.teacher,
+            method='post', data=data, pk=self.course.id,
+        )
+
+    def test_naive_start_date(self):
+        response = self.clone(start_date='2030-01-07T10:00:00')
+        self.assertEqual(response.status_code, 201)
+        clone = Course.objects.get(id=response.data['id'])
+        self.assertEqual(clone.start_date.year, 2030)
+
+    def test_invalid_start_date(self):
+        response = self.clone(start_date='next monday')
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Course.objects.count(), 1)
+
+    def test_outsider_can_not_clone(self):
+        response = self.request(
+            CourseCloneView, self.user, method='post', pk=self.course.id)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Course.objects.count(), 1)
+
+
+class AssessmentAnswerMapViewTestCase(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assessment = AssessmentFactory(course=self.course)
+        self.question = AssessmentQuestionFactory(assessment=self.assessment)
+        self.choice = AssessmentChoiceFactory(question=self.question)
+        AssessmentAnswer.objects.create(
+            student=self.user.student_profile, choice=self.choice,
+            attempt=self.assessment.start_attempt(
+                self.user.student_profile.id))
+        self.answer_map = {self.question.id: [self.choice.id]}
+
+    def get_answer_map(self, user, pk=None, **params):
+        request = self.factory.get('/', params)
+        force_authenticate(request, user=user)
+        return AssessmentAnswerMapView.as_view()(
+            request, pk=pk or self.assessment.id)
+
+    def test_own_answers(self):
+        response = self.get_answer_map(self.user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.answer_map)
+        response = self.get_answer_map(
+            self.user, student=self.user.student_profile.id)
+        self.assertEqual(response.data, self.answer_map)
+
+    def test_teacher_reads_student_answers(self):
+        response = self.get_answer_map(
+            self.teacher, student=self.user.student_profile.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, self.answer_map)
+
+    def test_other_student_is_rejected(self):
+        other = create_person('student')
+        response = self.get_answer_map(
+            other, student=self.user.student_profile.id)
+        self.assertEqual(response.status_code, 403)
+
+    def test_missing_assessment(self):
+        response = self.get_answer_map(self.user, pk=self.assessment.id + 1)
+        self.assertEqual(response.status_code, 404)
+
+
+class DiagnosticTestAnswerCreateAPIViewTestCase(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assessment = AssessmentFactory(
+            course=self.course,
+            assessment_type=Assessment.DIAGNOSTIC,
+            max_number_of_retries=0,
+        )
+        question = AssessmentQuestionFactory(assessment=self.assessment)
+        self.choice = AssessmentChoiceFactory(question=question)
+        self.enrollment = Enrollment.objects.create(
+            course=self.course, student=self.user.student_profile)
+
+    def answer(self):
+        return self.request(
+            DiagnosticTestAnswerCreateAPIView, self.user, method='post',
+            data={'course_id': self.course.id, 'choice': [self.choice.id]},
+        )
+
+    def test_answer(self):
+        self.assertEqual(self.answer().status_code, 201)
+        enrollment = Enrollment.objects.get(id=self.enrollment.id)
+        self.assertEqual(enrollment.diagnostic_answered_count, 1)
+
+    def test_no_attempts_left(self):
+        student_id = self.user.student_profile.id
+        self.assessment.start_attempt(student_id).submit()
+
+        self.assertEqual(self.answer().status_code, 409)
+        enrollment = Enrollment.objects.get(id=self.enrollment.id)
+        self.assertEqual(enrollment.diagnostic_answered_count, 0)
+        self.assertFalse(AssessmentAnswer.objects.filter(
+            student_id=student_id).exists())
+
+
+class CourseGradebookViewTestCase(ViewTestCase):
+    def get_gradebook(self, user, **params):
+        request = self.factory.get('/', params)
+        force_authenticate(request, user=user)
+        return CourseGradebookView.as_view()(request, pk=self.course.id)
+
+    def test_teacher_and_staff(self):
+        response = self.get_gradebook(self.teacher)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['students'], [])
+
+        staff = create_person('teacher')
+        staff.is_staff = True
+        staff.save()
+        response = self.get_gradebook(staff, export='csv')
+        self.assertEqual(response.status_code, 200)
+
+    def test_permission_denied(self):
+        for user in (self.user, create_person('teacher')):
+            for params in ({}, {'export': 'csv'}):
+                response = self.get_gradebook(user, **params)
+                self.assertEqual(response.status_code, 403)
+
+
+class CalendarFeedViewTestCase(ViewTestCase):
+    def test_feed(self):
+        response = self.request(CalendarFeedView, self.teacher, kind=TEACHER)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+
+    def test_missing_profile(self):
+        response = self.request(CalendarFeedView, self.teacher, kind=STUDENT)
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_kind(self):
+        response = self.request(CalendarFeedView, self.user, kind='parent')
+        self.assertEqual(response.status_code, 404)
+
+    def test_token_feed(self):
+        token = self.request(
+            CalendarFeedTokenView, self.user, kind=STUDENT).data['token']
+        request = self.factory.get('/')
+        response = TokenCalendarFeedView.as_view()(request, token=token)
+        self.assertEqual(response.status_code, 200)
+
+        response = TokenCalendarFeedView.as_view()(
+            request, token=token + 'x')
+        self.assertEqual(response.status_code, 404)
+
+
+class ExamPaperViewTestCase(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assessment = AssessmentFactory(
+            course=self.course, start_date=now() - timedelta(hours=1))
+        AssessmentQuestionFactory(assessment=self.assessment)
+
+    def get_paper(self, user):
+        return self.request(ExamPaperView, user, pk=self.assessment.id)
+
+    def test_enrolled_student(self):
+        Enrollment.objects.create(
+            course=self.course, student=self.user.student_profile)
+        self.assertEqual(self.get_paper(self.user).status_code, 200)
+
+    def test_not_enrolled_student(self):
+        self.assertEqual(self.get_paper(self.user).status_code, 403)
+
+    def test_teacher(self):
+        self.assertEqual(self.get_paper(self.teacher).status_code, 403)
+
+    def test_not_started(self):
+        Enrollment.objects.create(
+            course=self.course, student=self.user.student_profile)
+        self.assessment.start_date = now() + timedelta(hours=1)
+        self.assessment.save()
+        self.assertEqual(self.get_paper(self.user).status_code, 403)
+
+
+class AssessmentAnalyticsViewTestCase(ViewTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assessment = AssessmentFactory(course=self.course)
+
+    def test_teacher_only(self):
+        response = self.request(
+            AssessmentAnalyticsView, self.teacher, pk=self.assessment.id)
+        self.assertEqual(response.status_code, 200)
+        for user in (self.user, create_person('teacher')):
+            response = self.request(
+                AssessmentAnalyticsView, user, pk=self.assessment.id)
+            self.assertEqual(response.status_code, 403)
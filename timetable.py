@@ -0,0 +1,189 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+MAX_RECURRING_SESSIONS = getattr(
+    settings, 'GROUP_COURSES_MAX_RECURRING_SESSIONS', 52)
+MAX_RECURRING_INTERVAL_DAYS = 365
+
+
+class IntervalIndex:
+    """
+    Busy intervals of one person, sorted by start date.
+    max_ends[i] is the latest end among the first i + 1 intervals, so
+    an overlap check is a single bisect even if stored intervals
+    overlap each other.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.keys = []
+        self.max_ends = []
+
+    def __len__(self):
+        return len(self.starts)
+
+    def add(self, start, end, key=None):
+        position = bisect_left(self.starts, start)
+        if position == len(self.starts):
+            # intervals loaded in start order are simply appended
+            self.starts.append(start)
+            self.ends.append(end)
+            self.keys.append(key)
+            previous = self.max_ends[-1] if self.max_ends else end
+            self.max_ends.append(max(previous, end))
+            return
+        self.starts.insert(position, start)
+        self.ends.insert(position, end)
+        self.keys.insert(position, key)
+        previous = self.max_ends[position - 1] if position else end
+        self.max_ends.insert(position, max(previous, end))
+        # later prefixes only grow, and stop changing once they
+        # already reach past the new interval
+        for i in range(position + 1, len(self.max_ends)):
+            if self.max_ends[i] >= end:
+                break
+            self.max_ends[i] = end
+
+    def overlaps(self, start, end):
+        position = bisect_left(self.starts, end)
+        return position > 0 and self.max_ends[position - 1] > start
+
+    def conflicts(self, start, end):
+        """Keys of all stored intervals overlapping [start, end)."""
+        result = []
+        i = bisect_left(self.starts, end) - 1
+        while i >= 0 and self.max_ends[i] > start:
+            if self.ends[i] > start:
+                result.append(self.keys[i])
+            i -= 1
+        return result
+
+
+class Timetable:
+    """Busy intervals of teachers and assistants, indexed per person."""
+
+    def __init__(self):
+        self.index = defaultdict(IntervalIndex)
+
+    def add(self, people, start, end, key=None):
+        for person in people:
+            if person is not None:
+                self.index[person].add(start, end, key)
+
+    def overlaps(self, people, start, end):
+        return any(
+            self.index[person].overlaps(start, end)
+            for person in people if person in self.index
+        )
+
+    def conflicts(self, people, start, end):
+        return {
+            person: self.index[person].conflicts(start, end)
+            for person in people
+            if person in self.index
+            and self.index[person].overlaps(start, end)
+        }
+
+    @classmethod
+    def from_sessions(cls, sessions):
+        """
+        Build a timetable from a Session queryset, loading only the
+        columns needed to index it.
+        """
+        timetable = cls()
+        rows = sessions.order_by('start_date').values_list(
+            'id', 'start_date', 'end_date',
+            'lecture__course__teacher_id', 'lecture__course__assistant_id',
+        )
+        for id, start_date, end_date, teacher_id, assistant_id in \
+                rows.iterator():
+            timetable.add(
+                (teacher_id, assistant_id), start_date, end_date, id)
+        return timetable
+
+
+def get_course_people(course):
+    return [
+        person for person in (course.teacher_id, course.assistant_id)
+        if person is not None
+    ]
+
+
+def overlapping_sessions(people, start_date, end_date):
+    from edutailors.apps.group_courses.models import Session
+
+    return Session.objects.filter(
+        Q(lecture__course__teacher_id__in=people)
+        | Q(lecture__course__assistant_id__in=people),
+        start_date__lt=end_date,
+        end_date__gt=start_date,
+    )
+
+
+def validate_sessions(people, sessions):
+    """
+    Raise ValidationError if unsaved sessions overlap each other or
+    the existing sessions of `people`. The timetable of the whole
+    period is loaded once.
+    """
+    if not sessions:
+        return
+    sessions = sorted(sessions, key=lambda session: session.start_date)
+    timetable = Timetable.from_sessions(overlapping_sessions(
+        people,
+        sessions[0].start_date,
+        max(session.end_date for session in sessions),
+    ))
+    for session in sessions:
+        conflicts = timetable.conflicts(
+            people, session.start_date, session.end_date)
+        if conflicts:
+            raise ValidationError(
+                'Session at {} overlaps sessions {}'.format(
+                    session.start_date,
+                    ', '.join(sorted(
+                        key for keys in conflicts.values() for key in keys)),
+                ))
+        timetable.add(
+            people, session.start_date, session.end_date, session.id)
+
+
+def generate_recurring_sessions(lecture, start_date, end_date, count,
+                                interval=timedelta(weeks=1)):
+    """
+    Create `count` sessions of a lecture, each one `interval` after
+    the previous. The teacher and assistant timetable is loaded once,
+    and the sessions are inserted with a single bulk_create.
+    """
+    from edutailors.apps.group_courses.calendars import (
+        TEACHER, invalidate_calendars,
+    )
+    from edutailors.apps.group_courses.models import (
+        Session, get_duration, get_random_ids,
+    )
+
+    people = get_course_people(lecture.course)
+    has_default = lecture.sessions.filter(is_default=True).exists()
+    ids = get_random_ids(count)
+    sessions = [
+        Session(
+            id=ids[number],
+            lecture=lecture,
+            start_date=start_date + interval * number,
+            end_date=end_date + interval * number,
+            duration=get_duration(start_date, end_date),
+            is_default=not has_default and number == 0,
+        )
+        for number in range(count)
+    ]
+    validate_sessions(people, sessions)
+    sessions = Session.objects.bulk_create(sessions)
+    # bulk_create sends no post_save, so calendars are refreshed here
+    invalidate_calendars(TEACHER, people)
+    return sessions